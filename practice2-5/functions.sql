@@ -19,35 +19,47 @@ RETURNS TRIGGER
 LANGUAGE plpgsql
 AS $$
     BEGIN
-        IF (TG_OP = 'UPDATE') THEN
-            IF (OLD.completed = True and 'admin' not in (SELECT "shop"."get_roles_list"())) THEN
-                RAISE EXCEPTION 'Can not change completed task';
-            END IF;
+        IF (OLD.completed AND NOT pg_has_role(current_user, 'admin', 'MEMBER')) THEN
+            RAISE EXCEPTION 'Can not change completed task';
+        END IF;
+        IF (NEW.completed AND NOT OLD.completed) THEN
             NEW.close_date = current_date;
         END IF;
         RETURN NEW;
     END;
 $$;
 
+DROP TRIGGER IF EXISTS "check_completed" ON "shop"."tasks";
+
 CREATE TRIGGER "check_completed"
 BEFORE UPDATE ON "shop"."tasks"
-    FOR EACH ROW EXECUTE PROCEDURE "shop"."process_check_completed"();
+    FOR EACH ROW
+    WHEN (OLD.completed OR NEW.completed)
+    EXECUTE PROCEDURE "shop"."process_check_completed"();
 
 
-CREATE OR REPLACE FUNCTION "shop"."process_expire_complited_tasks"() 
-RETURNS trigger
+DROP TRIGGER IF EXISTS expire_complited_tasks ON "shop"."tasks";
+DROP FUNCTION IF EXISTS "shop"."process_expire_complited_tasks"();
+
+CREATE OR REPLACE PROCEDURE "shop"."expire_complited_tasks"(batch_size INT DEFAULT 1000)
 LANGUAGE plpgsql
-    AS $$
-        BEGIN
-        DELETE FROM "shop"."tasks" WHERE close_date < current_date - INTERVAL '12 month';
-        RETURN NEW;
+AS $$
+    DECLARE
+        deleted INT;
+    BEGIN
+        LOOP
+            DELETE FROM "shop"."tasks" WHERE id IN (
+                SELECT id FROM "shop"."tasks"
+                WHERE close_date < current_date - INTERVAL '12 month'
+                LIMIT batch_size
+            );
+            GET DIAGNOSTICS deleted = ROW_COUNT;
+            COMMIT;
+            EXIT WHEN deleted < batch_size;
+        END LOOP;
     END;
 $$;
 
-CREATE TRIGGER expire_complited_tasks
-AFTER INSERT OR UPDATE ON "shop"."tasks"
-    FOR EACH ROW EXECUTE PROCEDURE "shop"."process_expire_complited_tasks"();
-
 CREATE OR REPLACE FUNCTION "shop"."create_report"(user_ VARCHAR(100), date_start_ DATE, date_end_ DATE)
 RETURNS TABLE(
     "user" VARCHAR(100),
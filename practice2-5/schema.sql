@@ -82,4 +82,6 @@ CREATE TABLE "shop"."tasks" (
     "executor" VARCHAR(100) NOT NULL,
     "contract_id" INT REFERENCES "shop"."contract" ("id"),
     "contact_person_id" INT REFERENCES "shop"."contact_persons" ("id") NOT NULL
-);
\ No newline at end of file
+);
+
+CREATE INDEX "ix_tasks_close_date" ON "shop"."tasks" ("close_date") WHERE "close_date" IS NOT NULL;
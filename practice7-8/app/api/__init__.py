@@ -1,22 +1,21 @@
 from datetime import timedelta
 
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.providers import get_session
-from app.core.security import create_access_token, verify_password
+from app.api.routing import SessionReleasingRoute
+from app.core.security import create_access_token, verify_password_async
 from app.core.const import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.core.http_exceptions import credentials_exception
 from app.schemas.token import Token
 from app.crud.user import crud_user
 
 
-from .v1 import v1_router
+from .v1 import include_v1_routers
 
-api_router = APIRouter()
-
-api_router.include_router(v1_router, prefix="/v1")
+api_router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @api_router.post("/token", response_model=Token, tags=["token"])
@@ -28,7 +27,10 @@ async def login_for_access_token(
     if not db_obj:
         raise credentials_exception
 
-    if not verify_password(form_data.password, db_obj.password_hash):
+    # do not hold the connection while bcrypt runs
+    await db.close()
+
+    if not await verify_password_async(form_data.password, db_obj.password_hash):
         raise credentials_exception
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -38,4 +40,9 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-__all__ = ["api_router"]
+def include_api_routers(app: FastAPI, *, prefix: str = "/api") -> None:
+    include_v1_routers(app, prefix=f"{prefix}/v1")
+    app.include_router(api_router, prefix=prefix)
+
+
+__all__ = ["api_router", "include_api_routers"]
@@ -0,0 +1,185 @@
+import hashlib
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+from app.core.security import decode_access_token
+from app.crud.idempotency import crud_idempotency
+from app.db import engine
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+replayed_total = registry.counter(
+    "idempotency_replayed_total", "Responses replayed for a repeated key", ["route"]
+)
+
+
+def _hash_request(scope: Scope, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode()):
+        digest.update(part + b"\0")
+    digest.update(scope["query_string"] + b"\0")
+    digest.update(body)
+
+    return digest.digest()
+
+
+class IdempotencyMiddleware:
+    """
+    Serve `routes` ("METHOD /path" templates) sent with an Idempotency-Key
+    header once per key and client: a retry of the same request gets the
+    stored response, without running the handler again.
+
+    The key is claimed before the handler runs, so a retry racing the
+    first request gets 409. Responses with 5xx status drop the claim so
+    the request can be retried.
+    """
+
+    def __init__(self, app: ASGIApp, *, routes: List[str], lock_timeout: float):
+        self.app = app
+        self.route_keys = set(routes)
+        self.lock_timeout = lock_timeout
+        self.routes: Optional[List[Tuple[BaseRoute, str]]] = None
+
+    def _resolve_routes(self, app) -> List[Tuple[BaseRoute, str]]:
+        routes = []
+        for route in app.routes:
+            for method in getattr(route, "methods", None) or ():
+                key = f"{method} {route.path}"
+                if key in self.route_keys:
+                    routes.append((route, key))
+
+        return routes
+
+    def _match(self, scope: Scope) -> Optional[str]:
+        if self.routes is None:
+            self.routes = self._resolve_routes(scope["app"])
+
+        for route, key in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return key
+
+        return None
+
+    @staticmethod
+    def _owner(headers: Headers) -> Optional[str]:
+        scheme, _, token = headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+
+        payload = decode_access_token(token)
+
+        return payload.get("sub") if payload else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(HEADER)
+        route = self._match(scope) if key is not None else None
+        owner = self._owner(headers) if route is not None else None
+        if owner is None:
+            # unauthorized requests are rejected by the handler
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters"},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        messages: List[Message] = []
+        while not messages or messages[-1].get("more_body", False):
+            messages.append(await receive())
+            if messages[-1]["type"] != "http.request":
+                break
+
+        request_hash = _hash_request(
+            scope, b"".join(message.get("body", b"") for message in messages)
+        )
+
+        async with AsyncSession(engine) as session:
+            claimed = await crud_idempotency.claim(
+                session,
+                owner=owner,
+                key=key,
+                request_hash=request_hash,
+                lock_timeout=self.lock_timeout,
+            )
+            record = (
+                None
+                if claimed
+                else await crud_idempotency.get(session, owner=owner, key=key)
+            )
+
+        if not claimed:
+            if record is None or record.status_code is None:
+                response = JSONResponse(
+                    {"detail": f"A request with this {HEADER} is in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+            elif record.request_hash != request_hash:
+                response = JSONResponse(
+                    {"detail": f"{HEADER} was used for a different request"},
+                    status_code=422,
+                )
+            else:
+                replayed_total.inc(route=route)
+                response = Response(record.body, status_code=record.status_code)
+                for name, value in record.headers:
+                    response.headers.append(name, value)
+                response.headers["Idempotent-Replayed"] = "true"
+
+            await response(scope, receive, send)
+            return
+
+        async def replay_receive() -> Message:
+            return messages.pop(0) if messages else await receive()
+
+        start: Optional[Message] = None
+        body: List[bytes] = []
+        complete = False
+
+        async def recording_send(message: Message) -> None:
+            nonlocal start, complete
+
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                complete = not message.get("more_body", False)
+
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, recording_send)
+        finally:
+            async with AsyncSession(engine) as session:
+                if not complete or start["status"] >= 500:
+                    await crud_idempotency.release(session, owner=owner, key=key)
+                else:
+                    await crud_idempotency.save(
+                        session,
+                        owner=owner,
+                        key=key,
+                        status_code=start["status"],
+                        headers=[
+                            [name.decode("latin-1"), value.decode("latin-1")]
+                            for name, value in start.get("headers", [])
+                            if name.lower() != b"content-length"
+                        ],
+                        body=b"".join(body),
+                    )
@@ -1,43 +1,106 @@
-from typing import AsyncGenerator, List
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 
-from app.core.const import ALGORITHM, SECRET_KEY
+from app.api.routing import track_session
 from app.core.http_exceptions import (
     credentials_exception,
     permission_denied_exception,
+    version_conflict_exception,
     x_not_found_exception,
 )
-from app.core.security import oauth2_scheme
+from app.core.security import (
+    decode_access_token,
+    get_unverified_claims,
+    oauth2_scheme,
+)
+from app.crud import statements
 from app.crud.user import crud_user
-from app.db import engine
-from app.models import Group, User, UserGroup
-from fastapi import Depends
-from jose import JWTError, jwt
-from sqlalchemy import join, select
+from app.db import engine, replicas
+from app.models import User
+from fastapi import Depends, Header, Request
+from fastapi.security.utils import get_authorization_scheme_param
 from sqlalchemy.ext.asyncio import AsyncSession
 
 user_not_found_exception = x_not_found_exception("User")
 
 
-async def get_session() -> AsyncGenerator:
-    async with AsyncSession(engine, expire_on_commit=False) as session:
+def _get_token_subject(request: Request) -> Optional[str]:
+    """
+    Subject of the bearer token, not verified: only used to route reads
+    """
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer":
+        return None
+
+    claims = get_unverified_claims(token)
+
+    return claims.get("sub") if claims else None
+
+
+@asynccontextmanager
+async def _primary_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    One primary session per request, shared by the write session and the
+    read session when reads are routed to the primary: a request never
+    holds two primary connections at once
+    """
+    session = getattr(request.state, "primary_session", None)
+    if session is not None:
+        yield session
+        return
+
+    async with AsyncSession(
+        engine, expire_on_commit=False, info={"user": _get_token_subject(request)}
+    ) as session:
+        request.state.primary_session = session
+        track_session(session)
+        try:
+            yield session
+        finally:
+            request.state.primary_session = None
+
+
+async def get_session(request: Request) -> AsyncGenerator:
+    async with _primary_session(request) as session:
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator:
+    read_engine = await replicas.get_engine(_get_token_subject(request))
+    if read_engine is engine:
+        async with _primary_session(request) as session:
+            yield session
+        return
+
+    async with AsyncSession(read_engine, expire_on_commit=False) as session:
+        track_session(session)
         yield session
 
 
+async def _release_replica_session(session: AsyncSession) -> None:
+    """
+    Return the replica connection used for authorization before the
+    endpoint runs, the session reconnects if the endpoint reads again
+    """
+    if session.bind is not engine:
+        await session.close()
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ) -> User:
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
 
-    except JWTError:
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
 
     db_obj = await crud_user.get_by_name(db, name=username)
+    await _release_replica_session(db)
 
     if db_obj is None:
         raise user_not_found_exception
@@ -45,6 +108,28 @@ async def get_current_user(
     return db_obj
 
 
+def get_if_match(if_match: Optional[str] = Header(None)) -> Optional[str]:
+    """
+    Version the client expects to update, from an `If-Match: "<version>"` header
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    return if_match.strip().removeprefix("W/").strip('"')
+
+
+def check_version(obj, *expected: Optional[str]) -> None:
+    """
+    Fail fast with 409 when the first given expected version is stale.
+
+    The UPDATE itself is still guarded by the mapper `version_id_col`,
+    so a write racing between this check and the flush is rejected too.
+    """
+    version = next((str(v) for v in expected if v is not None), None)
+    if version is not None and version != str(obj.version):
+        raise version_conflict_exception
+
+
 class RoleChecker:
     def __init__(
         self,
@@ -59,21 +144,14 @@ class RoleChecker:
         self,
         *,
         user: User = Depends(get_current_user),
-        session: AsyncSession = Depends(get_session),
+        session: AsyncSession = Depends(get_read_session),
     ) -> bool:
         result = await session.execute(
-            select(Group.name)
-            .select_from(
-                join(User, UserGroup, UserGroup.user_id == User.id, isouter=True).join(
-                    Group,
-                    UserGroup.group_id == Group.id,
-                    isouter=True,
-                ),
-            )
-            .where(User.id == user.id)
+            statements.user_group_names, {"user_id": user.id}
         )
 
         groups = result.scalars().all()
+        await _release_replica_session(session)
 
         intersected_groups = set(self.allowed_groups).intersection(set(groups))
 
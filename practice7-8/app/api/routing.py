@@ -0,0 +1,60 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, List, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_request_sessions: ContextVar[Optional[List[AsyncSession]]] = ContextVar(
+    "request_sessions", default=None
+)
+
+
+def track_session(session: AsyncSession) -> None:
+    """
+    Close `session` as soon as the endpoint of the current request returns
+    """
+    sessions = _request_sessions.get()
+    if sessions is not None:
+        sessions.append(session)
+
+
+async def release_sessions() -> None:
+    sessions = _request_sessions.get()
+    while sessions:
+        await sessions.pop().close()
+
+
+class SessionReleasingRoute(APIRoute):
+    """
+    Return connections of request sessions to the pool before the response
+    is serialized and sent, not after it in the dependency teardown
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+
+        call = self.dependant.call
+        if not asyncio.iscoroutinefunction(call):
+            return
+
+        async def releasing_call(**values: Any) -> Any:
+            try:
+                return await call(**values)
+            finally:
+                await release_sessions()
+
+        self.dependant.call = releasing_call
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            token = _request_sessions.set([])
+            try:
+                return await handler(request)
+            finally:
+                _request_sessions.reset(token)
+
+        return route_handler
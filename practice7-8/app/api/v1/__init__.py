@@ -1,7 +1,10 @@
+from typing import Union
+
 from app.api.providers import get_current_user
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, FastAPI
 
 from .endpoints import (
+    changes,
     contact_person,
     equipment,
     group,
@@ -10,57 +13,35 @@ from .endpoints import (
     contract,
     task,
     report,
+    job,
 )
 
-v1_router = APIRouter()
+ROUTERS = [
+    (user.router, "/user", "user"),
+    (group.router, "/group", "group"),
+    (organization.router, "/organization", "organization"),
+    (contact_person.router, "/contact_person", "contact_person"),
+    (equipment.router, "/equipment", "equipment"),
+    (contract.router, "/contract", "contract"),
+    (task.router, "/task", "task"),
+    (report.router, "/report", "report"),
+    (job.router, "/jobs", "jobs"),
+    (changes.router, "/changes", "changes"),
+]
+
+
+def include_v1_routers(target: Union[FastAPI, APIRouter], *, prefix: str = "") -> None:
+    """
+    Include endpoint routers straight into `target`: every nested
+    include_router builds all of their routes again
+    """
+    for router, path, tag in ROUTERS:
+        target.include_router(
+            router,
+            prefix=prefix + path,
+            tags=[tag],
+            dependencies=[Depends(get_current_user)],
+        )
 
-v1_router.include_router(
-    user.router,
-    prefix="/user",
-    tags=["user"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    group.router,
-    prefix="/group",
-    tags=["group"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    organization.router,
-    prefix="/organization",
-    tags=["organization"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    contact_person.router,
-    prefix="/contact_person",
-    tags=["contact_person"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    equipment.router,
-    prefix="/equipment",
-    tags=["equipment"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    contract.router,
-    prefix="/contract",
-    tags=["contract"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    task.router,
-    prefix="/task",
-    tags=["task"],
-    dependencies=[Depends(get_current_user)],
-)
-v1_router.include_router(
-    report.router,
-    prefix="/report",
-    tags=["report"],
-    dependencies=[Depends(get_current_user)],
-)
 
-__all__ = ["v1_router"]
+__all__ = ["include_v1_routers"]
@@ -0,0 +1,67 @@
+import base64
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.providers import get_current_user, get_read_session
+from app.api.routing import SessionReleasingRoute
+from app.core.settings import settings
+from app.crud.changes import crud_changes
+from app.models import User
+from app.schemas.changes import ChangesOut, FullSyncPosition
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+invalid_continuation_exception = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid continuation",
+)
+
+
+def encode_position(position: FullSyncPosition) -> str:
+    return base64.urlsafe_b64encode(position.json().encode()).decode()
+
+
+def decode_position(continuation: str) -> FullSyncPosition:
+    try:
+        return FullSyncPosition.parse_raw(base64.urlsafe_b64decode(continuation))
+    except ValueError:
+        raise invalid_continuation_exception
+
+
+@router.get("/", response_model=ChangesOut)
+async def get_changes(
+    since: Optional[datetime] = None,
+    continuation: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Organizations, contact persons, contracts and own tasks changed since
+    the `cursor` of the previous call, and the ones deleted.
+
+    Without `since`, or when deletes since then were already purged,
+    everything is returned with `full` set and the client replaces its data.
+    A full sync comes in pages: while the response has a `continuation`,
+    pass it instead of `since` to get the next page.
+    """
+    position = decode_position(continuation) if continuation else None
+
+    retention = timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION)
+    if position or (since and since < datetime.now() - retention):
+        since = None
+
+    changes = await crud_changes.get(
+        session,
+        user=current_user,
+        since=since,
+        overlap=timedelta(seconds=settings.SYNC_CURSOR_OVERLAP),
+        limit=settings.SYNC_PAGE_SIZE,
+        position=position,
+    )
+    if changes["continuation"]:
+        changes["continuation"] = encode_position(changes["continuation"])
+
+    return changes
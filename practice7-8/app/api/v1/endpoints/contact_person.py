@@ -1,6 +1,6 @@
-from typing import List
-
-from app.api.providers import RoleChecker, get_session
+from app.api.formats import ListOptions, list_responses
+from app.api.providers import RoleChecker, get_read_session, get_session
+from app.api.routing import SessionReleasingRoute
 from app.core.http_exceptions import x_already_exists_exception, x_not_found_exception
 from app.crud.contact_person import crud_contact_person
 from app.crud.organization import crud_organization
@@ -12,7 +12,7 @@ from app.schemas.contact_person import (
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 admin_only = RoleChecker(["admin"])
 
 organization_not_found_exception = x_not_found_exception("Organization")
@@ -20,12 +20,13 @@ contact_person_already_exists_exception = x_already_exists_exception("Contact pe
 contact_person_not_found_exception = x_not_found_exception("Contact person")
 
 
-@router.get("/{organization}", response_model=List[ContactPersonOut])
+@router.get("/{organization}", responses=list_responses(ContactPersonOut))
 async def get(
     organization: str,
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all contact persons by organization name
@@ -38,7 +39,7 @@ async def get(
         session, organization=organization, skip=skip, limit=limit
     )
 
-    return contact_persons
+    return list_options.render(contact_persons, ContactPersonOut)
 
 
 @router.get("/", response_model=ContactPersonOut)
@@ -46,7 +47,7 @@ async def get_contact_person(
     first_name: str,
     second_name: str,
     email: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get contact person by first and second name
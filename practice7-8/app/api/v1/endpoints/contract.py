@@ -1,23 +1,41 @@
 from datetime import date
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from app.api.providers import RoleChecker, get_session
-from app.core.http_exceptions import x_already_exists_exception, x_not_found_exception
+from app.api.formats import ListOptions, list_responses
+from app.api.providers import (
+    RoleChecker,
+    check_version,
+    get_if_match,
+    get_read_session,
+    get_session,
+)
+from app.api.routing import SessionReleasingRoute
+from app.core.http_exceptions import (
+    version_conflict_exception,
+    x_already_exists_exception,
+    x_not_found_exception,
+)
 from app.crud.contract import crud_contract
+from app.crud.equipment import crud_equipment
 from app.crud.organization import crud_organization
+from app.models import EquipmentBalance
 from app.schemas.contract import (
     ContractCreate,
+    ContractDetailOut,
+    ContractEquipmentIn,
     ContractOut,
     ContractTypeCreate,
     ContractTypeOut,
     ContractTypeUpdate,
     ContractUpdate,
 )
-from fastapi import APIRouter, Depends
+from app.schemas.equipment import EquipmentOut
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 admin_only = RoleChecker(["admin"])
 
 organization_not_found_exception = x_not_found_exception("Organization")
@@ -28,13 +46,28 @@ contract_already_exists_exception = x_already_exists_exception("Contract")
 contract_type_not_found_exception = x_not_found_exception("Contract type")
 contract_type_already_exists_exception = x_already_exists_exception("Contract type")
 
+equipment_balance_not_found_exception = x_not_found_exception("Equipment balance")
+
+
+async def _get_equipment(
+    session: AsyncSession, serial_numbers: List[str]
+) -> List[EquipmentBalance]:
+    equipment = await crud_equipment.get_equipment_balance_by_serial_numbers(
+        session, serial_numbers=serial_numbers
+    )
+    if len(equipment) != len(set(serial_numbers)):
+        raise equipment_balance_not_found_exception
+
+    return equipment
+
 
-@router.get("/", response_model=List[ContractOut])
+@router.get("/", responses=list_responses(ContractOut))
 async def get_contracts_by_organization_name(
     organization_name: str = "",
     limit: int = 0,
     skip: int = 100,
-    session: AsyncSession = Depends(get_session),
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all contract or by organization name
@@ -54,13 +87,14 @@ async def get_contracts_by_organization_name(
         skip=skip,
     )
 
-    return contracts
+    return list_options.render(contracts, ContractOut)
 
 
 @router.get("/{contract_id}", response_model=ContractOut)
 async def get_contract_by_id(
     contract_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get contract by id
@@ -70,9 +104,78 @@ async def get_contract_by_id(
     if not contract:
         raise contract_not_found_exception
 
+    response.headers["ETag"] = f'"{contract.version}"'
+    return contract
+
+
+@router.get("/{contract_id}/detail", response_model=ContractDetailOut)
+async def get_contract_detail(
+    contract_id: UUID,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Get contract with its organization, type and equipment
+    """
+
+    contract = await crud_contract.get_detail(session, contract_id=contract_id)
+    if not contract:
+        raise contract_not_found_exception
+
+    response.headers["ETag"] = f'"{contract.version}"'
     return contract
 
 
+@router.post(
+    "/{contract_id}/equipment", status_code=201, response_model=List[EquipmentOut]
+)
+async def attach_equipment_to_contract(
+    contract_id: UUID,
+    equipment_in: ContractEquipmentIn,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Attach equipment to contract by serial numbers, attached ones are kept
+    """
+    contract = await crud_contract.get_by_id(session, contract_id=contract_id)
+    if not contract:
+        raise contract_not_found_exception
+
+    equipment = await _get_equipment(session, equipment_in.serial_numbers)
+
+    await crud_contract.attach_equipment(
+        session,
+        contract_id=contract.id,
+        equipment_ids=[item.id for item in equipment],
+    )
+
+    return equipment
+
+
+@router.delete("/{contract_id}/equipment", response_model=List[EquipmentOut])
+async def detach_equipment_from_contract(
+    contract_id: UUID,
+    equipment_in: ContractEquipmentIn,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Detach equipment from contract by serial numbers
+    """
+    contract = await crud_contract.get_by_id(session, contract_id=contract_id)
+    if not contract:
+        raise contract_not_found_exception
+
+    equipment = await _get_equipment(session, equipment_in.serial_numbers)
+
+    await crud_contract.detach_equipment(
+        session,
+        contract_id=contract.id,
+        equipment_ids=[item.id for item in equipment],
+    )
+
+    return equipment
+
+
 @router.post("/", response_model=ContractOut)
 async def create_contract(
     contract_in: ContractCreate,
@@ -101,7 +204,7 @@ async def create_contract(
 
     if not organization.first_contract_date:
         organization = await crud_organization.set_first_contact_date(
-            session, organization=organization, date=date.today()
+            session, organization=organization, first_contact_date=date.today()
         )
 
     return contract
@@ -111,20 +214,28 @@ async def create_contract(
 async def update_contract(
     contract_id: UUID,
     contract_in: ContractUpdate,
+    response: Response,
+    if_match: Optional[str] = Depends(get_if_match),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Update contract
+    Update contract, `If-Match` or `version` must match the current version
     """
 
     contract = await crud_contract.get_by_id(session, contract_id=contract_id)
     if not contract:
         raise contract_not_found_exception
 
-    contract = await crud_contract.update(
-        session, contract=contract, contract_in=contract_in
-    )
+    check_version(contract, if_match, contract_in.version)
 
+    try:
+        contract = await crud_contract.update(
+            session, contract=contract, contract_in=contract_in
+        )
+    except StaleDataError:
+        raise version_conflict_exception
+
+    response.headers["ETag"] = f'"{contract.version}"'
     return contract
 
 
@@ -144,7 +255,7 @@ async def delete_contract(
 async def get_contract_types(
     limit: int = 0,
     skip: int = 100,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all contract types
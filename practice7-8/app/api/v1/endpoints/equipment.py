@@ -1,7 +1,8 @@
-from typing import List
-
-from app.api.providers import RoleChecker, get_session
+from app.api.formats import ListOptions, list_responses
+from app.api.providers import RoleChecker, get_read_session, get_session
+from app.api.routing import SessionReleasingRoute
 from app.core.http_exceptions import x_already_exists_exception, x_not_found_exception
+from app.core.settings import settings
 from app.crud.equipment import crud_equipment
 from app.schemas.equipment import (
     EquipmentCreate,
@@ -9,11 +10,12 @@ from app.schemas.equipment import (
     EquipmentPositionCreate,
     EquipmentPositionOut,
     EquipmentPositionUpdate,
+    EquipmentStockOut,
 )
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 admin_only = RoleChecker(["admin"])
 
 equipment_position_ae = x_already_exists_exception("Equipment position")
@@ -22,11 +24,12 @@ equipment_balance_nf = x_not_found_exception("Equipment balance")
 equipment_balance_ae = x_already_exists_exception("Equipment balance")
 
 
-@router.get("/", response_model=List[EquipmentPositionOut])
+@router.get("/", responses=list_responses(EquipmentPositionOut))
 async def get_equipment_positions(
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all equipment positions
@@ -34,13 +37,31 @@ async def get_equipment_positions(
     equipment_positions = await crud_equipment.get_equipment_positions(
         session, skip=skip, limit=limit
     )
-    return equipment_positions
+    return list_options.render(equipment_positions, EquipmentPositionOut)
+
+
+@router.get("/stock/", responses=list_responses(EquipmentStockOut))
+async def get_equipment_stock(
+    skip: int = 0,
+    limit: int = 100,
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Get units, units assigned to contracts and value per equipment position
+    """
+    if settings.EQUIPMENT_STOCK_COUNTERS:
+        stock = await crud_equipment.get_stock_counters(session, skip=skip, limit=limit)
+    else:
+        stock = await crud_equipment.get_stock(session, skip=skip, limit=limit)
+
+    return list_options.render(stock, EquipmentStockOut)
 
 
 @router.get("/{name}", response_model=EquipmentPositionOut)
 async def get_equipment_position(
     name: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get equipment position by name
@@ -122,15 +143,13 @@ async def update_equipment_position(
     )
 
 
-@router.get(
-    "/balance/{name}",
-    response_model=List[EquipmentOut],
-)
+@router.get("/balance/{name}", responses=list_responses(EquipmentOut))
 async def get_balance_by_equipment_name(
     name: str,
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get equipment balance by equipment position name
@@ -145,7 +164,7 @@ async def get_balance_by_equipment_name(
         session, skip=skip, limit=limit, equipment_position=equipment_position
     )
 
-    return equipment
+    return list_options.render(equipment, EquipmentOut)
 
 
 @router.post(
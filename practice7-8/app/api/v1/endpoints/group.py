@@ -1,6 +1,7 @@
 from typing import List
 
-from app.api.providers import RoleChecker, get_session
+from app.api.providers import RoleChecker, get_read_session, get_session
+from app.api.routing import SessionReleasingRoute
 from app.core.http_exceptions import x_already_exists_exception, x_not_found_exception
 from app.crud.group import crud_group
 from app.crud.user import crud_user
@@ -9,7 +10,7 @@ from app.schemas.user import UserOut
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 admin_only = RoleChecker(["admin"])
 
@@ -20,7 +21,7 @@ group_nf = x_not_found_exception("Group")
 
 @router.get("/", response_model=List[GroupOut], dependencies=[Depends(admin_only)])
 async def get_groups(
-    skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_session)
+    skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get all groups
@@ -36,7 +37,7 @@ async def get_groups(
     tags=["user"],
 )
 async def get_user_by_group(
-    group_name: str, *, session: AsyncSession = Depends(get_session)
+    group_name: str, *, session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get users by group
@@ -68,12 +69,9 @@ async def add_user_to_group(
     if not group:
         raise group_nf
 
-    users = []
-    for username in group_add_users_in.usernames:
-        db_obj = await crud_user.get_by_name(session, name=username)
-        if not db_obj:
-            raise user_nf
-        users.append(db_obj)
+    users = await crud_user.get_by_names(session, names=group_add_users_in.usernames)
+    if None in users:
+        raise user_nf
 
     await crud_group.add_users_to_group(
         session, users_ids=[user.id for user in users], group_id=group.id
@@ -100,12 +98,9 @@ async def remove_users_from_group(
     if not group:
         raise group_nf
 
-    users = []
-    for username in group_add_users_in.usernames:
-        db_obj = await crud_user.get_by_name(session, name=username)
-        if not db_obj:
-            raise user_nf
-        users.append(db_obj)
+    users = await crud_user.get_by_names(session, names=group_add_users_in.usernames)
+    if None in users:
+        raise user_nf
 
     await crud_group.remove_users_from_group(
         session, users_ids=[user.id for user in users], group_id=group.id
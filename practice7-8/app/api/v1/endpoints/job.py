@@ -0,0 +1,90 @@
+from typing import Any
+from uuid import UUID
+
+from app.api.providers import RoleChecker, get_current_user, get_session
+from app.api.routing import SessionReleasingRoute
+from app.core.http_exceptions import permission_denied_exception, x_not_found_exception
+from app.crud.job import crud_job
+from app.crud.user import crud_user
+from app.models import Job, User
+from app.schemas.job import JobCreate, JobOut, JobStatus
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+is_admin = RoleChecker(["admin"], raise_not_allowed=False)
+is_admin_manager = RoleChecker(["admin", "manager"], raise_not_allowed=False)
+
+user_nf = x_not_found_exception("User")
+job_nf = x_not_found_exception("Job")
+job_result_nf = x_not_found_exception("Job result")
+
+
+async def _get_own_job(
+    id: UUID, session: AsyncSession, current_user: User, is_admin: bool
+) -> Job:
+    job = await crud_job.get_by_id(session, id=id)
+    if not job:
+        raise job_nf
+
+    if job.owner_id != current_user.id and not is_admin:
+        raise permission_denied_exception
+
+    return job
+
+
+@router.post("/", status_code=202, response_model=JobOut)
+async def submit_job(
+    job_in: JobCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin_manager: bool = Depends(is_admin_manager),
+):
+    """
+    Put report or export job to the queue
+    """
+    if job_in.params.user is None:
+        job_in.params.user = current_user.name
+
+    if job_in.params.user != current_user.name:
+        if not is_admin_manager:
+            raise permission_denied_exception
+
+        user = await crud_user.get_by_name(session, name=job_in.params.user)
+        if not user:
+            raise user_nf
+
+    job = await crud_job.create(session, owner=current_user, job_in=job_in)
+
+    return job
+
+
+@router.get("/{id}", response_model=JobOut)
+async def get_job_status(
+    id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Get job status
+    """
+    return await _get_own_job(id, session, current_user, is_admin)
+
+
+@router.get("/{id}/result", response_model=Any)
+async def get_job_result(
+    id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Get result of the finished job
+    """
+    job = await _get_own_job(id, session, current_user, is_admin)
+    if job.status != JobStatus.done:
+        raise job_result_nf
+
+    return job.result
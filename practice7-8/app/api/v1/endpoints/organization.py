@@ -1,26 +1,49 @@
-from typing import List
-
-from app.api.providers import RoleChecker, get_session
-from app.core.http_exceptions import x_already_exists_exception, x_not_found_exception
+from typing import Optional
+
+from app.api.formats import ListOptions, list_responses
+from app.api.providers import (
+    RoleChecker,
+    check_version,
+    get_current_user,
+    get_if_match,
+    get_read_session,
+    get_session,
+)
+from app.api.routing import SessionReleasingRoute
+from app.core.http_exceptions import (
+    version_conflict_exception,
+    x_already_exists_exception,
+    x_not_found_exception,
+)
+from app.core.settings import settings
+from app.crud.contact_person import crud_contact_person
+from app.crud.contract import crud_contract
 from app.crud.organization import crud_organization
+from app.crud.task import crud_task
+from app.models import User
 from app.schemas.organization import (
     OrganizationCreate,
     OrganizationOut,
     OrganizationUpdate,
 )
-from fastapi import APIRouter, Depends
+from app.schemas.overview import OrganizationOverviewOut
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 admin_only = RoleChecker(["admin"])
 
 organization_already_exists_exception = x_already_exists_exception("Organization")
 organization_not_found_exception = x_not_found_exception("Organization")
 
 
-@router.get("/", response_model=List[OrganizationOut])
+@router.get("/", responses=list_responses(OrganizationOut))
 async def get_organizations(
-    skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_session)
+    skip: int = 0,
+    limit: int = 100,
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all organizations
@@ -28,11 +51,13 @@ async def get_organizations(
     organizations = await crud_organization.get_organizations(
         session, skip=skip, limit=limit
     )
-    return organizations
+    return list_options.render(organizations, OrganizationOut)
 
 
 @router.get("/{name}", response_model=OrganizationOut)
-async def get_organization(name: str, session: AsyncSession = Depends(get_session)):
+async def get_organization(
+    name: str, response: Response, session: AsyncSession = Depends(get_read_session)
+):
     """
     Get organization by name
     """
@@ -40,9 +65,66 @@ async def get_organization(name: str, session: AsyncSession = Depends(get_sessio
     if not organization:
         raise organization_not_found_exception
 
+    response.headers["ETag"] = f'"{organization.version}"'
     return organization
 
 
+@router.get("/{name}/overview", response_model=OrganizationOverviewOut)
+async def get_organization_overview(
+    name: str,
+    contact_persons_limit: int = Query(
+        settings.ORGANIZATION_OVERVIEW_LIMIT,
+        ge=0,
+        le=settings.ORGANIZATION_OVERVIEW_MAX_LIMIT,
+    ),
+    contracts_limit: int = Query(
+        settings.ORGANIZATION_OVERVIEW_LIMIT,
+        ge=0,
+        le=settings.ORGANIZATION_OVERVIEW_MAX_LIMIT,
+    ),
+    tasks_limit: int = Query(
+        settings.ORGANIZATION_OVERVIEW_LIMIT,
+        ge=0,
+        le=settings.ORGANIZATION_OVERVIEW_MAX_LIMIT,
+    ),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get organization with its contact persons, contracts and their types,
+    and the current user's open tasks for it, one query per relation
+    """
+    organization = await crud_organization.get_by_name(session, name=name)
+    if not organization:
+        raise organization_not_found_exception
+
+    contact_persons = await crud_contact_person.get(
+        session, organization=organization, limit=contact_persons_limit
+    )
+    contracts = await crud_contract.get(
+        session,
+        organization_id=organization.id,
+        limit=contracts_limit,
+        with_type=True,
+    )
+    open_tasks = await crud_task.get_open_by_organization(
+        session,
+        user=current_user,
+        organization_id=organization.id,
+        limit=tasks_limit,
+    )
+
+    return {
+        "organization": organization,
+        "contact_persons": contact_persons,
+        "contracts": contracts,
+        "contract_types": list(
+            {contract.type_id: contract.type for contract in contracts}.values()
+        ),
+        "open_tasks": open_tasks,
+    }
+
+
 @router.post("/", status_code=201, response_model=OrganizationOut)
 async def create_organization(
     organization_in: OrganizationCreate,
@@ -68,19 +150,27 @@ async def create_organization(
 async def update_organization(
     name: str,
     organization_in: OrganizationUpdate,
+    response: Response,
+    if_match: Optional[str] = Depends(get_if_match),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Update organization
+    Update organization, `If-Match` or `version` must match the current version
     """
     organization = await crud_organization.get_by_name(session, name=name)
-    if organization:
+    if not organization:
         raise organization_not_found_exception
 
-    organization = await crud_organization.update(
-        session, organization=organization, organization_in=organization_in
-    )
+    check_version(organization, if_match, organization_in.version)
+
+    try:
+        organization = await crud_organization.update(
+            session, organization=organization, organization_in=organization_in
+        )
+    except StaleDataError:
+        raise version_conflict_exception
 
+    response.headers["ETag"] = f'"{organization.version}"'
     return organization
 
 
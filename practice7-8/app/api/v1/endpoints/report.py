@@ -1,18 +1,20 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.providers import RoleChecker, get_session, get_current_user
+from app.api.providers import RoleChecker, get_read_session, get_current_user
+from app.api.routing import SessionReleasingRoute
+from app.core.settings import settings
 from app.core.http_exceptions import (
     x_not_found_exception,
 )
 from app.schemas.report import ReportOut
 from app.crud.user import crud_user
-from app.crud.task import crud_task
+from app.crud.report import crud_report, get_standard_periods
 from app.models import User
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 admin_manager_only = RoleChecker(["admin", "manager"])
 
@@ -26,41 +28,24 @@ async def _get_report(
     if not user:
         raise user_nf
 
-    tasks = await crud_task.get_by_id_and_date_period(
+    if (start_date, end_date) in get_standard_periods(date.today()):
+        report = await crud_report.get_snapshot(
+            session,
+            user=user,
+            start_date=start_date,
+            end_date=end_date,
+            since=datetime.now() - timedelta(seconds=settings.REPORT_SNAPSHOT_MAX_AGE),
+        )
+        if report:
+            return report
+
+    return await crud_report.get(
         session,
         user=user,
         start_date=start_date,
         end_date=end_date,
     )
 
-    completed_task_count = 0
-    completed_out_of_date_task_count = 0
-    not_completed_task_count = 0
-    not_completed_out_of_date_task_count = 0
-
-    for task in tasks:
-        if task.completed:
-            if task.close_date <= task.due_date:
-                completed_task_count += 1
-            else:
-                completed_out_of_date_task_count += 1
-        else:
-            if task.due_date >= date.today():
-                not_completed_task_count += 1
-            else:
-                not_completed_out_of_date_task_count += 1
-
-    return ReportOut(
-        user=user.name,
-        start_date=start_date,
-        end_date=end_date,
-        task_count=len(tasks),
-        completed_task_count=completed_task_count,
-        completed_out_of_date_task_count=completed_out_of_date_task_count,
-        not_completed_task_count=not_completed_task_count,
-        not_completed_out_of_date_task_count=not_completed_out_of_date_task_count,
-    )
-
 
 @router.get(
     "/{user}",
@@ -71,7 +56,7 @@ async def get_user_report(
     user: str,
     start_date: date,
     end_date: date = date.today(),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await _get_report(
         start_date=start_date,
@@ -89,7 +74,7 @@ async def get_self_report(
     start_date: date,
     end_date: date = date.today(),
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await _get_report(
         start_date=start_date,
@@ -1,17 +1,37 @@
+import asyncio
+import json
+from datetime import date
 from uuid import UUID
-from typing import List
-
-from app.api.providers import RoleChecker, get_session, get_current_user
+from typing import List, Optional
+
+from app.api.formats import ListOptions, list_responses
+from app.api.providers import (
+    RoleChecker,
+    check_version,
+    get_if_match,
+    get_read_session,
+    get_session,
+    get_current_user,
+)
+from app.api.routing import SessionReleasingRoute
+from app.core.const import INSUFFICIENT_PRIVILEGE
+from app.core.settings import settings
 from app.core.http_exceptions import (
     x_already_exists_exception,
     x_not_found_exception,
     permission_denied_exception,
+    version_conflict_exception,
 )
 from app.crud.task import crud_task
 from app.crud.user import crud_user
 from app.crud.contact_person import crud_contact_person
 from app.models import User
+from app.notifications import task_changes
 from app.schemas.task import (
+    TaskBulkDelete,
+    TaskBulkFilter,
+    TaskBulkOut,
+    TaskBulkReassign,
     TaskCreate,
     TaskPriorityCreate,
     TaskPriorityOut,
@@ -20,10 +40,13 @@ from app.schemas.task import (
     TaskTypeOut,
     TaskTypeCreate,
 )
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 admin_only = RoleChecker(["admin"])
 admin_manager_only = admin_only.extend(["manager"])
@@ -39,19 +62,56 @@ task_type_ae = x_already_exists_exception("Task type")
 task_priority_ae = x_already_exists_exception("Task priority")
 
 
-@router.get(
-    "/",
-    response_model=List[TaskOut],
-)
+@router.get("/", responses=list_responses(TaskOut))
 async def get_tasks(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    list_options: ListOptions = Depends(),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
-    tasks = await crud_task.get(session, user=current_user, skip=skip, limit=limit)
+    tasks = await crud_task.get(
+        session,
+        user=current_user,
+        start_date=start_date,
+        end_date=end_date,
+        skip=skip,
+        limit=limit,
+    )
 
-    return tasks
+    return list_options.render(tasks, TaskOut)
+
+
+@router.get("/events")
+async def get_task_events(current_user: User = Depends(get_current_user)):
+    """
+    Stream changes of the current user's tasks as server-sent events,
+    `resync` means events were dropped and tasks have to be reloaded
+    """
+
+    async def stream():
+        with task_changes.subscribe(current_user.id) as subscription:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.TASK_EVENTS_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is None:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    yield f"event: task\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post(
@@ -104,6 +164,8 @@ async def create_task(
 async def update_task(
     id: UUID,
     task_in: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Depends(get_if_match),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
     is_admin: bool = Depends(is_admin),
@@ -115,6 +177,8 @@ async def update_task(
     if task.executor_id != current_user.id and not is_admin:
         raise permission_denied_exception
 
+    check_version(task, if_match, task_in.version)
+
     priority = None
     if task_in.priority:
         priority = await crud_task.get_priority(session, priority=task_in.priority)
@@ -133,18 +197,151 @@ async def update_task(
         if not executor:
             raise user_nf
 
-    task = await crud_task.update(
+    try:
+        task = await crud_task.update(
+            session,
+            task=task,
+            task_in=task_in,
+            executor=executor,
+            type_=type_,
+            priority=priority,
+            is_admin=is_admin,
+        )
+    except StaleDataError:
+        raise version_conflict_exception
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != INSUFFICIENT_PRIVILEGE:
+            raise
+        raise permission_denied_exception
+
+    response.headers["ETag"] = f'"{task.version}"'
+    return task
+
+
+@router.post(
+    "/bulk/reassign",
+    response_model=TaskBulkOut,
+    dependencies=[Depends(admin_manager_only)],
+)
+async def bulk_reassign_tasks(
+    bulk_in: TaskBulkReassign,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Reassign open tasks selected by ids and/or current executor
+    """
+    executor = await crud_user.get_by_name(session, name=bulk_in.new_executor_name)
+    if not executor:
+        raise user_nf
+
+    ids = await crud_task.bulk_reassign(
         session,
-        user=current_user,
-        task_in=task_in,
         executor=executor,
-        type_=type_,
-        priority=priority,
+        user=current_user,
+        is_admin=is_admin,
+        ids=bulk_in.ids,
+        executor_name=bulk_in.executor_name,
     )
 
+    return {"ids": ids}
+
+
+@router.post("/bulk/complete", response_model=TaskBulkOut)
+async def bulk_complete_tasks(
+    bulk_in: TaskBulkFilter,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Mark open tasks selected by ids and/or executor completed
+    """
+    ids = await crud_task.bulk_complete(
+        session,
+        user=current_user,
+        is_admin=is_admin,
+        ids=bulk_in.ids,
+        executor_name=bulk_in.executor_name,
+    )
+
+    return {"ids": ids}
+
+
+@router.post(
+    "/bulk/delete",
+    response_model=TaskBulkOut,
+    dependencies=[Depends(admin_only)],
+)
+async def bulk_delete_tasks(
+    bulk_in: TaskBulkDelete,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Delete tasks selected by ids, executor and/or completion
+    """
+    ids = await crud_task.bulk_delete(
+        session,
+        ids=bulk_in.ids,
+        executor_name=bulk_in.executor_name,
+        completed=bulk_in.completed,
+    )
+
+    return {"ids": ids}
+
+
+async def set_task_completed(
+    id: UUID, completed: bool, session: AsyncSession, user: User, is_admin: bool
+):
+    try:
+        task = await crud_task.set_completed(
+            session, id=id, completed=completed, user=user, is_admin=is_admin
+        )
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != INSUFFICIENT_PRIVILEGE:
+            raise
+        raise permission_denied_exception
+
+    if task:
+        return task
+
+    # nothing updated: tell a missing task from a foreign or unchanged one
+    task = await crud_task.get_by_id(session, id=id)
+    if not task:
+        raise task_nf
+    if task.executor_id != user.id and not is_admin:
+        raise permission_denied_exception
+
     return task
 
 
+@router.post("/{id}/complete", response_model=TaskOut)
+async def complete_task(
+    id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Mark task completed
+    """
+    return await set_task_completed(id, True, session, current_user, is_admin)
+
+
+@router.post("/{id}/reopen", response_model=TaskOut)
+async def reopen_task(
+    id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    is_admin: bool = Depends(is_admin),
+):
+    """
+    Reopen completed task, only admins can reopen tasks
+    """
+    return await set_task_completed(id, False, session, current_user, is_admin)
+
+
 @router.delete(
     "/{id}",
     status_code=204,
@@ -165,7 +362,7 @@ async def delete_task(
 async def get_task_types(
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await crud_task.get_types(session, skip=skip, limit=limit)
 
@@ -208,7 +405,7 @@ async def delete_task_type(
 async def get_task_priorities(
     skip: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await crud_task.get_priorities(session, skip=skip, limit=limit)
 
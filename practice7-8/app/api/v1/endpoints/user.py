@@ -1,18 +1,24 @@
-from app.api.providers import RoleChecker, get_current_user, get_session
+from app.api.providers import (
+    RoleChecker,
+    get_current_user,
+    get_read_session,
+    get_session,
+)
+from app.api.routing import SessionReleasingRoute
 from app.core.http_exceptions import (
     credentials_exception,
     permission_denied_exception,
     x_already_exists_exception,
     x_not_found_exception,
 )
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.crud.user import crud_user
 from app.models import User
 from app.schemas.user import UserCreate, UserOut, UserUpdateName, UserUpdatePassword
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 admin_only = RoleChecker(["admin"])
 is_admin = RoleChecker(["admin"], raise_not_allowed=False)
@@ -45,7 +51,7 @@ async def create_user(
 
 @router.get("/{username}", response_model=UserOut)
 async def get_user_by_name(
-    username: str, *, session: AsyncSession = Depends(get_session)
+    username: str, *, session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get user by id
@@ -77,7 +83,7 @@ async def change_user_password(
     if not user_obj:
         raise user_not_found_exception
 
-    if not verify_password(
+    if not await verify_password_async(
         user_update_password_in.old_password, user_obj.password_hash
     ):
         raise credentials_exception
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import registry
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+in_flight_gauge = registry.gauge(
+    "admission_in_flight", "Requests being served by route class", ["route_class"]
+)
+rejected_total = registry.counter(
+    "admission_rejected_total",
+    "Requests shed by the admission controller",
+    ["route", "reason"],
+)
+
+
+class AdmissionMiddleware:
+    """
+    Shed `expensive` routes ("METHOD /path" templates) with a fast 503
+    while the pool of `engine` is saturated: more than `max_pool_waiting`
+    checkouts are queued, the oldest has waited `max_pool_wait` seconds,
+    or `max_expensive` expensive requests are already in flight.
+
+    Every other route is admitted, so cheap reads keep flowing instead of
+    queueing behind reports and bulk writes until the pool timeout.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        engine: AsyncEngine,
+        expensive: List[str],
+        max_pool_waiting: int,
+        max_pool_wait: float,
+        max_expensive: int,
+        retry_after: int,
+    ):
+        self.app = app
+        self.engine = engine
+        self.expensive = set(expensive)
+        self.max_pool_waiting = max_pool_waiting
+        self.max_pool_wait = max_pool_wait
+        self.max_expensive = max_expensive
+        self.retry_after = retry_after
+        self.in_flight: Dict[str, int] = {CHEAP: 0, EXPENSIVE: 0}
+        self.routes: Optional[List[Tuple[BaseRoute, str]]] = None
+
+    def _resolve_routes(self, app) -> List[Tuple[BaseRoute, str]]:
+        routes = []
+        for route in app.routes:
+            for method in getattr(route, "methods", None) or ():
+                key = f"{method} {route.path}"
+                if key in self.expensive:
+                    routes.append((route, key))
+
+        return routes
+
+    def _match(self, scope: Scope) -> Optional[str]:
+        if self.routes is None:
+            self.routes = self._resolve_routes(scope["app"])
+
+        for route, key in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return key
+
+        return None
+
+    def _reject_reason(self) -> Optional[str]:
+        pool = self.engine.sync_engine.pool
+
+        if pool.waiting > self.max_pool_waiting:
+            return "pool_waiting"
+
+        if pool.wait >= self.max_pool_wait:
+            return "pool_wait"
+
+        if self.in_flight[EXPENSIVE] >= self.max_expensive:
+            return "in_flight"
+
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._match(scope)
+        route_class = CHEAP if route is None else EXPENSIVE
+
+        if route is not None:
+            reason = self._reject_reason()
+            if reason is not None:
+                rejected_total.inc(route=route, reason=reason)
+                response = JSONResponse(
+                    {"detail": "Server is busy, retry later"},
+                    status_code=503,
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+                await response(scope, receive, send)
+                return
+
+        self.in_flight[route_class] += 1
+        in_flight_gauge.set(self.in_flight[route_class], route_class=route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[route_class] -= 1
+            in_flight_gauge.set(self.in_flight[route_class], route_class=route_class)
@@ -0,0 +1,153 @@
+import gzip
+from typing import Callable, Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# content types sent as they are, the start message goes out without
+# waiting for the body: streams and formats compressed already
+PASSTHROUGH_TYPES = (
+    "text/event-stream",
+    "image/",
+    "audio/",
+    "video/",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+)
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """
+    Accepted encodings with their quality values
+    """
+    encodings = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+
+        encodings[name.strip().lower()] = quality
+
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Compress complete response bodies of at least `minimum_size` bytes with
+    brotli (when installed) or gzip, as negotiated by Accept-Encoding.
+
+    Streaming and already compressed content types are passed through as
+    soon as the response starts, and bodies
+    of `offload_size` bytes or more are compressed in a worker thread so
+    the event loop is not blocked.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int,
+        offload_size: int,
+        gzip_level: int,
+        brotli_quality: int,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.compressors: Dict[str, Callable[[bytes], bytes]] = {
+            "gzip": lambda body: gzip.compress(body, compresslevel=gzip_level)
+        }
+        if brotli is not None:
+            self.compressors["br"] = lambda body: brotli.compress(
+                body, quality=brotli_quality
+            )
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(PASSTHROUGH_TYPES):
+            return False
+
+        content_length = headers.get("content-length")
+
+        return content_length is None or int(content_length) >= self.minimum_size
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        ranked = sorted(
+            (quality, name == "br", name)
+            for name, quality in accepted.items()
+            if name in self.compressors and quality > 0
+        )
+
+        return ranked[-1][2] if ranked else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compress = self.compressors[encoding]
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                # only a body that may be compressed holds the start back
+                if self.is_compressible(Headers(raw=message["headers"])):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= self.offload_size:
+                body = await anyio.to_thread.run_sync(compress, body)
+            else:
+                body = compress(body)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
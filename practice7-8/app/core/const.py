@@ -1,5 +1,11 @@
-import secrets
+from app.core.settings import settings
 
-SECRET_KEY = secrets.token_hex(64)
+SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# SQLSTATE raised by check_completed trigger
+INSUFFICIENT_PRIVILEGE = "42501"
+
+# SQLSTATE of a lock not taken within lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
@@ -25,3 +25,9 @@ x_already_exists_exception = lambda x: HTTPException(
     detail=f"{x} already exists",
     headers=DEFAULT_HEADERS,
 )
+
+version_conflict_exception = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Resource was modified by another request",
+    headers=DEFAULT_HEADERS,
+)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Optional, Tuple
+
+from starlette.routing import BaseRoute
+
+from .metrics import registry
+from .settings import settings
+
+logger = logging.getLogger("app.monitoring")
+
+loop_lag_seconds = registry.gauge(
+    "event_loop_lag_seconds", "How late the event loop woke up the lag probe"
+)
+loop_blocked_total = registry.counter(
+    "event_loop_blocked_total",
+    "Callbacks that blocked the event loop longer than the threshold",
+    ["route"],
+)
+loop_blocked_seconds_total = registry.counter(
+    "event_loop_blocked_seconds_total",
+    "Time the event loop spent in blocking callbacks",
+    ["route"],
+)
+
+
+def find_route(frame: Optional[FrameType]) -> str:
+    """
+    Route being served by the innermost request handler on the stack
+    """
+    while frame is not None:
+        route = frame.f_locals.get("self")
+        if isinstance(route, BaseRoute) and frame.f_code.co_name == "handle":
+            scope = frame.f_locals.get("scope") or {}
+            return f"{scope.get('method', '')} {getattr(route, 'path', '')}".strip()
+
+        frame = frame.f_back
+
+    return "-"
+
+
+class LoopLagMonitor:
+    """
+    Measure how late the event loop wakes up a task sleeping `interval`.
+
+    With `block_threshold` set, a watchdog thread samples the stack of the
+    loop thread once it is `block_threshold` seconds overdue, and the
+    sample is reported with the route being served when the loop recovers.
+    """
+
+    def __init__(self, interval: float, block_threshold: Optional[float] = None):
+        # blocks shorter than the probe interval can hide between probes
+        self.interval = (
+            min(interval, block_threshold / 2) if block_threshold else interval
+        )
+        self.block_threshold = block_threshold
+        self.lag = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+        self.due = float("inf")
+        self.loop_thread: Optional[int] = None
+        self.sample: Optional[Tuple[str, str]] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self.due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            loop_lag_seconds.set(self.lag)
+
+            sample, self.sample = self.sample, None
+            if sample and self.lag >= self.block_threshold:
+                self._report(self.lag, *sample)
+
+    def _report(self, blocked: float, route: str, stack: str) -> None:
+        loop_blocked_total.inc(route=route)
+        loop_blocked_seconds_total.inc(blocked, route=route)
+        logger.warning(
+            "Event loop blocked for %.3fs serving %s\n%s",
+            blocked,
+            route,
+            stack,
+            extra={"route": route},
+        )
+
+    def _watch(self) -> None:
+        while not self.stopping.wait(self.block_threshold / 2):
+            if self.sample or time.monotonic() - self.due < self.block_threshold:
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is not None:
+                self.sample = (
+                    find_route(frame),
+                    "".join(traceback.format_stack(frame)),
+                )
+
+    def start(self) -> None:
+        if self.task is not None:
+            return
+
+        self.task = asyncio.create_task(self._run())
+
+        if self.block_threshold:
+            self.loop_thread = threading.get_ident()
+            self.stopping.clear()
+            self.watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self.watchdog.start()
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+
+        self.stopping.set()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+        self.task = None
+
+
+loop_lag = LoopLagMonitor(
+    settings.LOOP_LAG_INTERVAL,
+    settings.LOOP_BLOCK_THRESHOLD if settings.LOOP_MONITOR_ENABLED else None,
+)
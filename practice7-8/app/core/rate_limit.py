@@ -0,0 +1,155 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import registry
+from .security import decode_access_token
+
+limited_total = registry.counter(
+    "rate_limited_total", "Requests rejected by the rate limiter", ["route"]
+)
+buckets_gauge = registry.gauge("rate_limit_buckets", "Token buckets held in memory")
+
+
+class RateLimit:
+    """
+    `requests` per `period` seconds, parsed from "<requests>/<period>"
+    """
+
+    def __init__(self, requests: int, period: float):
+        self.burst = requests
+        self.rate = requests / period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        requests, _, period = value.partition("/")
+        return cls(int(requests), float(period or 1))
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Take a token for `key`, seconds to wait when there is none
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets of one process. A bucket is kept as a single float, the
+    time it will be full again (GCRA), in least recently used order: full
+    buckets are the same as missing ones and are dropped, and past
+    `max_buckets` the least recently used go too.
+    """
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.buckets: "OrderedDict[str, float]" = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        while self.buckets:
+            key, full_at = next(iter(self.buckets.items()))
+            if full_at > now and len(self.buckets) <= self.max_buckets:
+                break
+
+            del self.buckets[key]
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        interval = 1 / limit.rate
+
+        full_at = max(self.buckets.get(key, now), now) + interval
+        wait = full_at - limit.burst * interval - now
+
+        if wait <= 0:
+            self.buckets[key] = full_at
+            self.buckets.move_to_end(key)
+
+        self._evict(now)
+        buckets_gauge.set(len(self.buckets))
+
+        return max(wait, 0.0)
+
+
+class RateLimitMiddleware:
+    """
+    Limit requests per JWT subject (client address without a valid token)
+    and route. `limits` maps "METHOD /path" route templates to "<n>/<sec>",
+    `default` applies to every other route with one bucket per client.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limits: Dict[str, str],
+        default: Optional[str] = None,
+        backend: RateLimitBackend,
+    ):
+        self.app = app
+        self.limits = {key: RateLimit.parse(value) for key, value in limits.items()}
+        self.default = RateLimit.parse(default) if default else None
+        self.backend = backend
+        self.routes: Optional[List[Tuple[BaseRoute, str, RateLimit]]] = None
+
+    def _resolve_routes(self, app) -> List[Tuple[BaseRoute, str, RateLimit]]:
+        routes = []
+        for route in app.routes:
+            for method in getattr(route, "methods", None) or ():
+                key = f"{method} {route.path}"
+                if key in self.limits:
+                    routes.append((route, key, self.limits[key]))
+
+        return routes
+
+    def _match(self, scope: Scope) -> Tuple[str, Optional[RateLimit]]:
+        if self.routes is None:
+            self.routes = self._resolve_routes(scope["app"])
+
+        for route, key, limit in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return key, limit
+
+        return "*", self.default
+
+    def _client(self, scope: Scope) -> str:
+        connection = HTTPConnection(scope)
+
+        scheme, _, token = connection.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            payload = decode_access_token(token)
+            if payload and payload.get("sub"):
+                return f"sub:{payload['sub']}"
+
+        return f"ip:{connection.client.host if connection.client else '-'}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route, limit = self._match(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self.backend.acquire(f"{self._client(scope)} {route}", limit)
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        limited_total.inc(route=route)
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+        await response(scope, receive, send)
@@ -1,25 +1,77 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
 
 
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from passlib.context import CryptContext
 
 from .const import ALGORITHM, SECRET_KEY
+from .settings import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# passlib and jose are imported on first use to keep startup fast
+
+
+@lru_cache()
+def get_pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+T = TypeVar("T")
+
+
+class BcryptExecutor:
+    """
+    Run bcrypt off the event loop on a bounded thread pool
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+
+bcrypt_executor = BcryptExecutor(settings.BCRYPT_WORKERS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await bcrypt_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await bcrypt_executor.run(get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -30,4 +82,31 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     return encoded_jwt
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
\ No newline at end of file
+def decode_access_token(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
+def get_unverified_claims(token: str) -> Optional[dict]:
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.get_unverified_claims(token)
+    except JWTError:
+        return None
+
+
+def warm_up() -> None:
+    """
+    Import jose and load the bcrypt backend before the first request
+    """
+    from jose import jwt  # noqa: F401
+
+    get_pwd_context().handler("bcrypt").get_backend()
+
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
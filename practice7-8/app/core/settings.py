@@ -1,5 +1,7 @@
-from typing import Optional
-from pydantic import BaseSettings
+import secrets
+from typing import Dict, List, Optional
+from pydantic import BaseSettings, Field
+
 
 class Settings(BaseSettings):
     class Config:
@@ -7,9 +9,121 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
     POSTGRES_DSN: str
-    
-    APP_HOST: Optional[str] = '0.0.0.0'
+    POSTGRES_REPLICA_DSNS: List[str] = []
+
+    REPLICA_MAX_LAG: float = 5.0
+    REPLICA_CHECK_INTERVAL: float = 1.0
+    REPLICA_CHECK_TIMEOUT: float = 1.0
+    REPLICA_STICKY_FOR: float = 10.0
+
+    APP_HOST: Optional[str] = "0.0.0.0"
     APP_PORT: Optional[int] = 8080
 
+    SECRET_KEY: str = Field(default_factory=lambda: secrets.token_hex(64))
+
+    APP_WORKERS: Optional[int] = None
+    APP_LOOP: str = "auto"
+    APP_HTTP: str = "auto"
+    APP_KEEP_ALIVE: int = 5
+    APP_BACKLOG: int = 2048
+    APP_LIMIT_CONCURRENCY: Optional[int] = None
+    APP_LIMIT_MAX_REQUESTS: Optional[int] = None
+
+    # primary connections of all server processes together: each worker
+    # gets an equal share but never less than POSTGRES_POOL_MIN_SIZE, and
+    # without APP_WORKERS the launcher starts no more workers than fit
+    POSTGRES_POOL_BUDGET: int = 15
+    POSTGRES_POOL_MIN_SIZE: int = 2
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_WARM: int = 2
+    POSTGRES_QUERY_CACHE_SIZE: int = 500
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 256
+
+    BCRYPT_WORKERS: int = 2
+
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # "METHOD /route/template": "<requests>/<seconds>", per worker
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /api/token": "10/60",
+        "GET /api/v1/report/": "30/60",
+        "GET /api/v1/report/{user}": "30/60",
+    }
+    RATE_LIMIT_DEFAULT: Optional[str] = None
+    RATE_LIMIT_MAX_BUCKETS: int = 100_000
+
+    # "METHOD /route/template" shed with 503 while the pool is saturated
+    ADMISSION_EXPENSIVE_ROUTES: List[str] = [
+        "GET /api/v1/report/",
+        "GET /api/v1/report/{user}",
+        "GET /api/v1/changes/",
+        "POST /api/v1/task/bulk/reassign",
+        "POST /api/v1/task/bulk/complete",
+        "POST /api/v1/task/bulk/delete",
+    ]
+    ADMISSION_MAX_POOL_WAITING: int = 2
+    ADMISSION_MAX_POOL_WAIT: float = 0.1
+    ADMISSION_MAX_EXPENSIVE: int = 4
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # "METHOD /route/template" honouring the Idempotency-Key header
+    IDEMPOTENCY_ROUTES: List[str] = [
+        "POST /api/v1/task/",
+        "POST /api/v1/contract/",
+    ]
+    IDEMPOTENCY_KEY_TTL: int = 24 * 3600
+    IDEMPOTENCY_LOCK_TIMEOUT: float = 60.0
+    IDEMPOTENCY_PURGE_INTERVAL: int = 3600
+
+    # read equipment stock from the trigger-kept counters, not a GROUP BY
+    EQUIPMENT_STOCK_COUNTERS: bool = True
+
+    # items per relation on the organization overview, by default and at most
+    ORGANIZATION_OVERVIEW_LIMIT: int = 50
+    ORGANIZATION_OVERVIEW_MAX_LIMIT: int = 500
+
+    LOOP_LAG_INTERVAL: float = 0.5
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_BLOCK_THRESHOLD: float = 0.1
+
+    HEALTH_DB_TIMEOUT: float = 1.0
+    HEALTH_MAX_DB_LATENCY: float = 0.5
+    HEALTH_MAX_POOL_WAITING: int = 2
+    HEALTH_MAX_LOOP_LAG: float = 0.5
+    HEALTH_MAX_BCRYPT_QUEUE: int = 8
+
+    WORKER_CONCURRENCY: int = 4
+    WORKER_POLL_INTERVAL: float = 1.0
+    JOB_TIMEOUT: int = 600
+    # extra seconds before a running job is requeued as stale, so the
+    # worker that timed it out records the outcome first
+    JOB_REQUEUE_GRACE: int = 60
+    JOB_MAX_ATTEMPTS: int = 3
+
+    REPORT_SNAPSHOT_INTERVAL: int = 3600
+    REPORT_SNAPSHOT_MAX_AGE: int = 24 * 3600
+
+    TASK_RETENTION_MONTHS: int = 12
+    TASK_RETENTION_BATCH_SIZE: int = 1000
+    TASK_RETENTION_INTERVAL: int = 3600
+
+    TASK_PARTITION_MONTHS_AHEAD: int = 3
+    TASK_PARTITION_INTERVAL: int = 24 * 3600
+    # seconds dropping an expired partition waits for the task table lock
+    TASK_PARTITION_LOCK_TIMEOUT: float = 2.0
+
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    TASK_EVENTS_KEEPALIVE: float = 15.0
+    TASK_EVENTS_RECONNECT_DELAY: float = 1.0
+
+    SYNC_CURSOR_OVERLAP: float = 30.0
+    SYNC_TOMBSTONE_RETENTION: int = 30 * 24 * 3600
+    SYNC_TOMBSTONE_INTERVAL: int = 3600
+    # rows of each kind in one page of a full sync
+    SYNC_PAGE_SIZE: int = 1000
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
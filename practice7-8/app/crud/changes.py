@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ContactPerson, Contract, Organization, Task, Tombstone, User
+from app.schemas.changes import FullSyncPosition
+
+SYNCED = {
+    "organizations": Organization,
+    "contact_persons": ContactPerson,
+    "contracts": Contract,
+    "tasks": Task,
+}
+
+
+class CRUDChanges:
+    async def get(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        since: Optional[datetime] = None,
+        overlap: timedelta = timedelta(),
+        limit: int,
+        position: Optional[FullSyncPosition] = None,
+    ) -> dict:
+        """
+        Rows visible to `user` changed or deleted after `since`.
+
+        Writes are stamped with their transaction start, so one committed
+        up to `overlap` late is still returned; repeated rows are harmless
+        upserts for the client.
+
+        Without `since` every row is returned, in pages of up to `limit`
+        rows of each kind read as of the first page. `continuation` is the
+        `position` the next page starts from, None on the last page. Rows
+        changed while paging are newer than `cursor` and come with the
+        next sync from it.
+        """
+        if position:
+            until = position.until
+        else:
+            result = await session.execute(select(func.localtimestamp()))
+            until = result.scalar_one()
+        after = since - overlap if since else None
+
+        visible = {
+            "tasks": [or_(Task.executor_id == user.id, Task.author_id == user.id)]
+        }
+
+        changes = {"cursor": until, "full": since is None, "deleted": []}
+        incomplete = {}
+        for key, model in SYNCED.items():
+            stmt = select(model).where(model.updated_at <= until, *visible.get(key, ()))
+            if after:
+                stmt = stmt.where(model.updated_at > after).order_by(model.updated_at)
+            elif position and key not in position.after:
+                changes[key] = []
+                continue
+            else:
+                if position:
+                    stmt = stmt.where(model.id > position.after[key])
+                stmt = stmt.order_by(model.id).limit(limit)
+
+            result = await session.execute(stmt)
+            changes[key] = result.scalars().all()
+
+            if not after and len(changes[key]) == limit:
+                incomplete[key] = changes[key][-1].id
+
+        changes["continuation"] = (
+            FullSyncPosition(until=until, after=incomplete) if incomplete else None
+        )
+
+        if after:
+            current = {
+                (model.__tablename__, row.id)
+                for key, model in SYNCED.items()
+                for row in changes[key]
+            }
+            changes["deleted"] = [
+                tombstone
+                for tombstone in await self.get_tombstones(
+                    session, user=user, after=after, until=until
+                )
+                if (tombstone.entity, tombstone.entity_id) not in current
+            ]
+
+        return changes
+
+    async def get_tombstones(
+        self, session: AsyncSession, *, user: User, after: datetime, until: datetime
+    ) -> List[Tombstone]:
+        stmt = (
+            select(Tombstone)
+            .where(
+                Tombstone.deleted_at > after,
+                Tombstone.deleted_at <= until,
+                or_(
+                    Tombstone.visible_to.is_(None),
+                    Tombstone.visible_to.any(user.id),
+                ),
+            )
+            .order_by(Tombstone.deleted_at)
+        )
+
+        result = await session.execute(stmt)
+
+        return result.scalars().all()
+
+    async def purge_tombstones(self, session: AsyncSession, *, before: datetime) -> int:
+        result = await session.execute(
+            delete(Tombstone).where(Tombstone.deleted_at < before)
+        )
+        await session.commit()
+
+        return result.rowcount
+
+
+crud_changes = CRUDChanges()
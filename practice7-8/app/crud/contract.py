@@ -1,7 +1,8 @@
 from typing import List, Optional
 from uuid import UUID
 
-from app.models import Contract, ContractType
+from app.crud import statements
+from app.models import Contract, ContractEquipment, ContractType
 from app.schemas.contract import (
     ContractCreate,
     ContractTypeCreate,
@@ -9,8 +10,10 @@ from app.schemas.contract import (
     ContractUpdate,
 )
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import and_, delete, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 
 class CRUDContract:
@@ -21,10 +24,13 @@ class CRUDContract:
         organization_id: Optional[int] = None,
         skip: int = 0,
         limit: int = 100,
+        with_type: bool = False,
     ) -> List[Contract]:
         sel = select(Contract).offset(skip).limit(limit)
         if organization_id:
             sel = sel.where(Contract.organization_id == organization_id)
+        if with_type:
+            sel = sel.options(joinedload(Contract.type))
 
         result = await session.execute(sel)
 
@@ -33,8 +39,18 @@ class CRUDContract:
     async def get_by_id(
         self, session: AsyncSession, *, contract_id: UUID
     ) -> Optional[Contract]:
+        result = await session.execute(statements.contract_by_id, {"id": contract_id})
+
+        return result.scalars().first()
+
+    async def get_detail(
+        self, session: AsyncSession, *, contract_id: UUID
+    ) -> Optional[Contract]:
+        """
+        Contract with its organization, type and equipment with positions
+        """
         result = await session.execute(
-            select(Contract).where(Contract.id == contract_id)
+            statements.contract_detail_by_id, {"id": contract_id}
         )
 
         return result.scalars().first()
@@ -48,7 +64,7 @@ class CRUDContract:
         type_id: UUID,
     ) -> Contract:
         contract = Contract(
-            **contract_in.dict(exclude=["organization_name", "type"]),
+            **contract_in.dict(exclude={"organization_name", "type_"}),
             organization_id=organization_id,
             type_id=type_id,
         )
@@ -79,6 +95,36 @@ class CRUDContract:
         session.delete(contract)
         await session.commit()
 
+    async def attach_equipment(
+        self, session: AsyncSession, *, contract_id: UUID, equipment_ids: List[UUID]
+    ) -> None:
+        stmt = (
+            insert(ContractEquipment)
+            .values(
+                [
+                    {"contract_id": contract_id, "equipment_id": equipment_id}
+                    for equipment_id in equipment_ids
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+
+        await session.execute(stmt)
+        await session.commit()
+
+    async def detach_equipment(
+        self, session: AsyncSession, *, contract_id: UUID, equipment_ids: List[UUID]
+    ) -> None:
+        stmt = delete(ContractEquipment).where(
+            and_(
+                ContractEquipment.contract_id == contract_id,
+                ContractEquipment.equipment_id.in_(equipment_ids),
+            )
+        )
+
+        await session.execute(stmt)
+        await session.commit()
+
     async def get_types(
         self,
         session: AsyncSession,
@@ -94,7 +140,7 @@ class CRUDContract:
         self, session: AsyncSession, *, type_: str
     ) -> Optional[ContractType]:
         result = await session.execute(
-            select(ContractType).where(ContractType.type == type_)
+            statements.contract_type_by_type, {"type": type_}
         )
 
         return result.scalars().first()
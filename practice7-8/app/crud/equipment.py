@@ -1,13 +1,20 @@
 from typing import List
 
-from app.models import EquipmentBalance, EquipmentPosition
+from app.crud import statements
+from app.models import (
+    ContractEquipment,
+    EquipmentBalance,
+    EquipmentPosition,
+    EquipmentStock,
+)
 from app.schemas.equipment import (
     EquipmentCreate,
     EquipmentPositionCreate,
     EquipmentPositionUpdate,
 )
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -116,6 +123,18 @@ class CRUDEquipment:
 
         return result.scalars().first()
 
+    async def get_equipment_balance_by_serial_numbers(
+        self,
+        session: AsyncSession,
+        *,
+        serial_numbers: List[str],
+    ) -> List[EquipmentBalance]:
+        result = await session.execute(
+            statements.equipment_by_serial_numbers, {"serial_numbers": serial_numbers}
+        )
+
+        return result.scalars().all()
+
     async def create_equipment_balance(
         self,
         session: AsyncSession,
@@ -142,5 +161,76 @@ class CRUDEquipment:
         session.delete(equipment_balance)
         await session.commit()
 
+    async def get_stock(
+        self,
+        session: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Row]:
+        """
+        Units, assigned units and value per position, counted in one query
+        """
+        assigned_units = select(ContractEquipment.equipment_id).distinct().subquery()
+        total = func.count(EquipmentBalance.id)
+        assigned = func.count(assigned_units.c.equipment_id)
+
+        result = await session.execute(
+            select(
+                EquipmentPosition.id.label("position_id"),
+                EquipmentPosition.name,
+                EquipmentPosition.price,
+                total.label("total"),
+                assigned.label("assigned"),
+                (total - assigned).label("available"),
+                (EquipmentPosition.price * total).label("value"),
+            )
+            .outerjoin(
+                EquipmentBalance, EquipmentBalance.position_id == EquipmentPosition.id
+            )
+            .outerjoin(
+                assigned_units, assigned_units.c.equipment_id == EquipmentBalance.id
+            )
+            .group_by(EquipmentPosition.id)
+            .order_by(EquipmentPosition.name)
+            .offset(skip)
+            .limit(limit)
+        )
+
+        return result.all()
+
+    async def get_stock_counters(
+        self,
+        session: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Row]:
+        """
+        Same as `get_stock`, read from the counters kept by triggers
+        """
+        total = func.coalesce(EquipmentStock.total, 0)
+        assigned = func.coalesce(EquipmentStock.assigned, 0)
+
+        result = await session.execute(
+            select(
+                EquipmentPosition.id.label("position_id"),
+                EquipmentPosition.name,
+                EquipmentPosition.price,
+                total.label("total"),
+                assigned.label("assigned"),
+                (total - assigned).label("available"),
+                (EquipmentPosition.price * total).label("value"),
+            )
+            .outerjoin(
+                EquipmentStock, EquipmentStock.position_id == EquipmentPosition.id
+            )
+            .order_by(EquipmentPosition.name)
+            .offset(skip)
+            .limit(limit)
+        )
+
+        return result.all()
+
 
 crud_equipment = CRUDEquipment()
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
 
 from app.models import Group, UserGroup
+from app.crud import statements
 
 
 class CRUDGroup:
@@ -14,9 +15,7 @@ class CRUDGroup:
         return result.scalars().all()
 
     async def get_by_name(self, session: AsyncSession, *, name: str) -> Optional[Group]:
-        stmt = select(Group).where(Group.name == name)
-
-        result = await session.execute(stmt)
+        result = await session.execute(statements.group_by_name, {"name": name})
 
         return result.scalars().first()
 
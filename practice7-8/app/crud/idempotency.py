@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IdempotencyKey
+
+
+class CRUDIdempotency:
+    async def get(
+        self, session: AsyncSession, *, owner: str, key: str
+    ) -> Optional[IdempotencyKey]:
+        result = await session.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.owner == owner, IdempotencyKey.key == key
+            )
+        )
+
+        return result.scalars().first()
+
+    async def claim(
+        self,
+        session: AsyncSession,
+        *,
+        owner: str,
+        key: str,
+        request_hash: bytes,
+        lock_timeout: float,
+    ) -> bool:
+        """
+        Record the key as being served, False when it is taken already.
+        A claim left without a response for `lock_timeout` seconds (the
+        server died mid-request) can be taken over.
+        """
+        stmt = (
+            insert(IdempotencyKey)
+            .values(owner=owner, key=key, request_hash=request_hash)
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.owner, IdempotencyKey.key],
+                set_={"request_hash": request_hash, "created_at": func.now()},
+                where=and_(
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at
+                    < func.now() - timedelta(seconds=lock_timeout),
+                ),
+            )
+            .returning(IdempotencyKey.key)
+        )
+
+        result = await session.execute(stmt)
+        claimed = result.first() is not None
+        await session.commit()
+
+        return claimed
+
+    async def save(
+        self,
+        session: AsyncSession,
+        *,
+        owner: str,
+        key: str,
+        status_code: int,
+        headers: List[List[str]],
+        body: bytes,
+    ) -> None:
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.owner == owner, IdempotencyKey.key == key)
+            .values(status_code=status_code, headers=headers, body=body)
+        )
+        await session.commit()
+
+    async def release(self, session: AsyncSession, *, owner: str, key: str) -> None:
+        """
+        Drop a claim whose request failed, so a retry runs it again
+        """
+        await session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.owner == owner,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        await session.commit()
+
+    async def purge(self, session: AsyncSession, *, before: datetime) -> int:
+        result = await session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < before)
+        )
+        await session.commit()
+
+        return result.rowcount
+
+
+crud_idempotency = CRUDIdempotency()
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Job, User
+from app.schemas.job import JobCreate, JobStatus
+from app.crud import statements
+
+
+class CRUDJob:
+    async def get_by_id(self, session: AsyncSession, *, id: UUID) -> Optional[Job]:
+        result = await session.execute(statements.job_by_id, {"id": id})
+
+        return result.scalars().first()
+
+    async def create(
+        self, session: AsyncSession, *, owner: User, job_in: JobCreate
+    ) -> Job:
+        job = Job(
+            kind=job_in.kind,
+            status=JobStatus.queued,
+            params=jsonable_encoder(job_in.params),
+            owner_id=owner.id,
+        )
+        session.add(job)
+
+        await session.commit()
+        await session.refresh(job)
+
+        return job
+
+    async def claim(self, session: AsyncSession) -> Optional[Job]:
+        """
+        Take the oldest queued job, skipping rows locked by other workers
+        """
+        queued = (
+            select(Job.id)
+            .where(Job.status == JobStatus.queued)
+            .order_by(Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id == queued)
+            .values(
+                status=JobStatus.running,
+                started_at=datetime.now(),
+                attempts=Job.attempts + 1,
+            )
+            .returning(Job)
+        )
+
+        result = await session.execute(select(Job).from_statement(stmt))
+        job = result.scalars().first()
+
+        await session.commit()
+
+        return job
+
+    async def _end_attempt(self, session: AsyncSession, *, job: Job, **values) -> bool:
+        """
+        Record the outcome of the `job` attempt this worker claimed, False
+        when the job was requeued as stale and the attempt no longer owns it
+        """
+        result = await session.execute(
+            update(Job)
+            .where(
+                and_(
+                    Job.id == job.id,
+                    Job.status == JobStatus.running,
+                    Job.attempts == job.attempts,
+                )
+            )
+            .values(finished_at=datetime.now(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        return result.rowcount == 1
+
+    async def finish(self, session: AsyncSession, *, job: Job, result: Any) -> bool:
+        return await self._end_attempt(
+            session, job=job, status=JobStatus.done, result=result, error=None
+        )
+
+    async def fail(
+        self, session: AsyncSession, *, job: Job, error: str, max_attempts: int
+    ) -> bool:
+        return await self._end_attempt(
+            session,
+            job=job,
+            status=(
+                JobStatus.failed if job.attempts >= max_attempts else JobStatus.queued
+            ),
+            error=error,
+        )
+
+    async def requeue_stale(self, session: AsyncSession, *, timeout: timedelta) -> None:
+        """
+        Return jobs of crashed workers back to the queue. `timeout` must
+        exceed the time a worker gives a job, or a job still running is
+        requeued and run twice.
+        """
+        await session.execute(
+            update(Job)
+            .where(
+                and_(
+                    Job.status == JobStatus.running,
+                    Job.started_at < datetime.now() - timeout,
+                )
+            )
+            .values(status=JobStatus.queued)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
+crud_job = CRUDJob()
@@ -0,0 +1,100 @@
+"""
+Batched lookups by key.
+
+A loader collects the `load` calls made for one column in the same event
+loop tick and resolves them with a single `column = ANY(:keys)` query.
+Results, missing rows included, are memoized for the life of the session,
+which is one request for the API sessions.
+
+Calls batch only when they are awaited together, with `load_many` or
+`asyncio.gather`; a loop awaiting `load` one key at a time still runs one
+query per key.
+"""
+import asyncio
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+
+class Loader:
+    def __init__(
+        self, session: AsyncSession, column: InstrumentedAttribute, lock: asyncio.Lock
+    ):
+        self.session = session
+        self.key = column.key
+        self.statement = select(column.class_).where(
+            column == any_(bindparam("keys", type_=ARRAY(column.type)))
+        )
+        # batches of different loaders share the session one at a time
+        self.lock = lock
+        self.cache: Dict[Hashable, asyncio.Future] = {}
+        self.batch: Dict[Hashable, asyncio.Future] = {}
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Optional[Any]:
+        future = self.cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.cache[key] = loop.create_future()
+            if not self.batch:
+                loop.call_soon(self._dispatch)
+            self.batch[key] = future
+
+        return await future
+
+    async def load_many(self, keys: List[Hashable]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        batch, self.batch = self.batch, {}
+
+        task = asyncio.create_task(self._fetch(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _fetch(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            async with self.lock:
+                result = await self.session.execute(
+                    self.statement, {"keys": list(batch)}
+                )
+                found = {getattr(obj, self.key): obj for obj in result.scalars()}
+        except Exception as exc:
+            for key, future in batch.items():
+                # not memoized, a later call tries again
+                self.cache.pop(key, None)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+class Loaders:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.lock = asyncio.Lock()
+        self.loaders: Dict[Tuple[type, str], Loader] = {}
+
+    def get(self, column: InstrumentedAttribute) -> Loader:
+        key = (column.class_, column.key)
+        if key not in self.loaders:
+            self.loaders[key] = Loader(self.session, column, self.lock)
+
+        return self.loaders[key]
+
+
+def get_loader(session: AsyncSession, column: InstrumentedAttribute) -> Loader:
+    """
+    Loader of `column` rows, shared by everything using the session
+    """
+    loaders = session.info.get("loaders")
+    if loaders is None:
+        loaders = session.info["loaders"] = Loaders(session)
+
+    return loaders.get(column)
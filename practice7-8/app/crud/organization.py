@@ -8,6 +8,7 @@ from fastapi.encoders import jsonable_encoder
 
 from app.models import Organization
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.crud import statements
 
 
 class CRUDOrganization:
@@ -30,9 +31,7 @@ class CRUDOrganization:
         *,
         name: str,
     ) -> Optional[Organization]:
-        stmt = select(Organization).where(Organization.name == name)
-
-        result = await session.execute(stmt)
+        result = await session.execute(statements.organization_by_name, {"name": name})
 
         return result.scalars().first()
 
@@ -85,10 +84,12 @@ class CRUDOrganization:
         organization: Organization,
         first_contact_date: date,
     ) -> Organization:
-        organization.first_contact_date = first_contact_date
+        organization.first_contract_date = first_contact_date
         session.add(organization)
         await session.commit()
         await session.refresh(organization)
 
+        return organization
+
 
 crud_organization = CRUDOrganization()
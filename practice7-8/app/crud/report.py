@@ -0,0 +1,165 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.task import crud_task
+from app.models import ReportSnapshot, Task, User
+from app.schemas.report import ReportOut
+
+
+def get_standard_periods(today: date) -> List[Tuple[date, date]]:
+    """
+    Last week, last month and last quarter relative to today
+    """
+    week_start = today - timedelta(days=today.weekday())
+
+    month_start = today.replace(day=1)
+    last_month_end = month_start - timedelta(days=1)
+
+    quarter_start = month_start.replace(month=(month_start.month - 1) // 3 * 3 + 1)
+    last_quarter_end = quarter_start - timedelta(days=1)
+    last_quarter_start = last_quarter_end.replace(
+        month=(last_quarter_end.month - 1) // 3 * 3 + 1, day=1
+    )
+
+    return [
+        (week_start - timedelta(days=7), week_start - timedelta(days=1)),
+        (last_month_end.replace(day=1), last_month_end),
+        (last_quarter_start, last_quarter_end),
+    ]
+
+
+class CRUDReport:
+    async def get(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        start_date: date,
+        end_date: date,
+    ) -> ReportOut:
+        tasks = await crud_task.get_by_id_and_date_period(
+            session,
+            user=user,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+        completed_task_count = 0
+        completed_out_of_date_task_count = 0
+        not_completed_task_count = 0
+        not_completed_out_of_date_task_count = 0
+
+        for task in tasks:
+            if task.completed:
+                if task.close_date <= task.due_date:
+                    completed_task_count += 1
+                else:
+                    completed_out_of_date_task_count += 1
+            else:
+                if task.due_date >= date.today():
+                    not_completed_task_count += 1
+                else:
+                    not_completed_out_of_date_task_count += 1
+
+        return ReportOut(
+            user=user.name,
+            start_date=start_date,
+            end_date=end_date,
+            task_count=len(tasks),
+            completed_task_count=completed_task_count,
+            completed_out_of_date_task_count=completed_out_of_date_task_count,
+            not_completed_task_count=not_completed_task_count,
+            not_completed_out_of_date_task_count=not_completed_out_of_date_task_count,
+            as_of=datetime.now(),
+        )
+
+    async def get_snapshot(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        start_date: date,
+        end_date: date,
+        since: datetime,
+    ) -> Optional[ReportOut]:
+        """
+        Snapshot computed after `since`, None when there is no such snapshot
+        """
+        stmt = select(ReportSnapshot).where(
+            and_(
+                ReportSnapshot.user_id == user.id,
+                ReportSnapshot.start_date == start_date,
+                ReportSnapshot.end_date == end_date,
+                ReportSnapshot.as_of >= since,
+            )
+        )
+
+        result = await session.execute(stmt)
+        snapshot = result.scalars().first()
+        if not snapshot:
+            return None
+
+        return ReportOut(
+            user=user.name,
+            start_date=snapshot.start_date,
+            end_date=snapshot.end_date,
+            task_count=snapshot.task_count,
+            completed_task_count=snapshot.completed_task_count,
+            completed_out_of_date_task_count=snapshot.completed_out_of_date_task_count,
+            not_completed_task_count=snapshot.not_completed_task_count,
+            not_completed_out_of_date_task_count=snapshot.not_completed_out_of_date_task_count,
+            as_of=snapshot.as_of,
+        )
+
+    async def get_executors(self, session: AsyncSession) -> List[User]:
+        stmt = select(User).where(User.id.in_(select(Task.executor_id).distinct()))
+
+        result = await session.execute(stmt)
+
+        return result.scalars().all()
+
+    async def save_snapshot(
+        self, session: AsyncSession, *, user: User, report: ReportOut
+    ) -> None:
+        data = report.dict(exclude={"user"})
+        data["user_id"] = user.id
+
+        stmt = insert(ReportSnapshot).values(data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                ReportSnapshot.user_id,
+                ReportSnapshot.start_date,
+                ReportSnapshot.end_date,
+            ],
+            set_={
+                key: stmt.excluded[key]
+                for key in data
+                if key not in ("user_id", "start_date", "end_date")
+            },
+        )
+
+        await session.execute(stmt)
+        await session.commit()
+
+    async def get_fresh_snapshot_keys(
+        self, session: AsyncSession, *, since: datetime
+    ) -> List[Tuple]:
+        """
+        Keys of snapshots computed after `since`, they can be skipped
+        """
+        stmt = select(
+            ReportSnapshot.user_id,
+            ReportSnapshot.start_date,
+            ReportSnapshot.end_date,
+        ).where(ReportSnapshot.as_of >= since)
+
+        result = await session.execute(stmt)
+
+        return [tuple(row) for row in result.all()]
+
+
+crud_report = CRUDReport()
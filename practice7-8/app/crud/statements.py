@@ -0,0 +1,77 @@
+"""
+Prebuilt statements for hot lookups.
+
+Statements are built once with bind parameters, so SQLAlchemy computes
+their cache key once and every call hits the compiled cache; the asyncpg
+driver then reuses the prepared statement for the same SQL.
+"""
+from sqlalchemy import String, any_, bindparam, join, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import (
+    Contract,
+    ContractType,
+    EquipmentBalance,
+    Group,
+    Job,
+    Organization,
+    Task,
+    TaskKey,
+    TaskPriority,
+    TaskType,
+    User,
+    UserGroup,
+)
+
+user_by_name = select(User).where(User.name == bindparam("name"))
+
+user_group_names = (
+    select(Group.name)
+    .select_from(
+        join(User, UserGroup, UserGroup.user_id == User.id, isouter=True).join(
+            Group, UserGroup.group_id == Group.id, isouter=True
+        )
+    )
+    .where(User.id == bindparam("user_id"))
+)
+
+group_by_name = select(Group).where(Group.name == bindparam("name"))
+
+organization_by_name = select(Organization).where(
+    Organization.name == bindparam("name")
+)
+
+contract_by_id = select(Contract).where(Contract.id == bindparam("id"))
+
+# organization and type joined, equipment with positions in one more query
+contract_detail_by_id = contract_by_id.options(
+    joinedload(Contract.organization),
+    joinedload(Contract.type),
+    selectinload(Contract.equipment).joinedload(EquipmentBalance.position),
+)
+
+# ANY(array) keeps one statement for any number of serial numbers
+equipment_by_serial_numbers = select(EquipmentBalance).where(
+    EquipmentBalance.serial_number
+    == any_(bindparam("serial_numbers", type_=ARRAY(String)))
+)
+
+contract_type_by_type = select(ContractType).where(
+    ContractType.type == bindparam("type")
+)
+
+# the open_date looked up in task_key prunes the scan to one partition
+task_by_id = select(Task).where(
+    Task.id == bindparam("id"),
+    Task.open_date
+    == select(TaskKey.open_date).where(TaskKey.id == bindparam("id")).scalar_subquery(),
+)
+
+task_type_by_type = select(TaskType).where(TaskType.type == bindparam("type"))
+
+task_priority_by_priority = select(TaskPriority).where(
+    TaskPriority.priority == bindparam("priority")
+)
+
+job_by_id = select(Job).where(Job.id == bindparam("id"))
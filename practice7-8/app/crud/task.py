@@ -2,18 +2,28 @@ from uuid import UUID
 from typing import Optional, List
 from datetime import date
 
-from sqlalchemy import select, delete, and_, or_
+from sqlalchemy import select, delete, update, and_, or_, func, literal, any_
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from fastapi.encoders import jsonable_encoder
 
-from app.models import Task, User, TaskType, TaskPriority
+from app.core.const import LOCK_NOT_AVAILABLE
+from app.models import ContactPerson, Contract, Task, User, TaskType, TaskPriority
 from app.schemas.task import TaskCreate, TaskPriorityCreate, TaskTypeCreate, TaskUpdate
+from app.crud import statements
 
 
 class CRUDTask:
     async def get(
-        self, session: AsyncSession, *, user: User, skip: int = 0, limit: int = 100
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        skip: int = 0,
+        limit: int = 100,
     ) -> Optional[Task]:
         stmt = (
             select(Task)
@@ -21,16 +31,56 @@ class CRUDTask:
             .offset(skip)
             .limit(limit)
         )
+        if start_date:
+            stmt = stmt.where(Task.open_date >= start_date)
+        if end_date:
+            stmt = stmt.where(Task.open_date <= end_date)
 
         result = await session.execute(stmt)
 
         return result.scalars().all()
 
-    async def get_by_id(self, session: AsyncSession, *, id: UUID) -> Optional[Task]:
-        stmt = select(Task).where(Task.id == id)
+    async def get_open_by_organization(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        organization_id: UUID,
+        limit: int = 100,
+    ) -> List[Task]:
+        """
+        Open tasks of the user for contact persons or contracts of the
+        organization, the earliest due first
+        """
+        stmt = (
+            select(Task)
+            .where(
+                Task.completed.is_(False),
+                or_(Task.executor_id == user.id, Task.author_id == user.id),
+                or_(
+                    Task.contact_person_id.in_(
+                        select(ContactPerson.id).where(
+                            ContactPerson.organization_id == organization_id
+                        )
+                    ),
+                    Task.contract_id.in_(
+                        select(Contract.id).where(
+                            Contract.organization_id == organization_id
+                        )
+                    ),
+                ),
+            )
+            .order_by(Task.due_date.asc().nulls_last(), Task.open_date)
+            .limit(limit)
+        )
 
         result = await session.execute(stmt)
 
+        return result.scalars().all()
+
+    async def get_by_id(self, session: AsyncSession, *, id: UUID) -> Optional[Task]:
+        result = await session.execute(statements.task_by_id, {"id": id})
+
         return result.scalars().first()
 
     async def get_by_id_and_date_period(
@@ -84,6 +134,7 @@ class CRUDTask:
         executor: Optional[User] = None,
         type_: Optional[TaskType] = None,
         priority: Optional[TaskPriority] = None,
+        is_admin: bool = False,
     ) -> Task:
         data = jsonable_encoder(task)
 
@@ -99,15 +150,249 @@ class CRUDTask:
             if field in update_data:
                 setattr(task, field, update_data[field])
 
+        if is_admin:
+            await self.allow_completed_changes(session)
+
         await session.commit()
         await session.refresh(task)
 
         return task
 
+    async def set_completed(
+        self,
+        session: AsyncSession,
+        *,
+        id: UUID,
+        completed: bool,
+        user: User,
+        is_admin: bool = False,
+    ) -> Optional[Task]:
+        """
+        Complete or reopen a task of `user` (any task for admins)
+        in one conditional UPDATE, None when no row matched
+        """
+        # check_completed trigger sets close_date on completion
+        values = {"completed": completed, "version": Task.version + 1}
+        if not completed:
+            values["close_date"] = None
+
+            if is_admin:
+                await self.allow_completed_changes(session)
+
+        stmt = (
+            update(Task)
+            .where(
+                Task.id == id,
+                Task.completed.is_not(completed),
+                or_(Task.executor_id == user.id, literal(is_admin)),
+            )
+            .values(**values)
+            .returning(Task)
+        )
+
+        result = await session.execute(
+            select(Task).from_statement(stmt).execution_options(populate_existing=True)
+        )
+        task = result.scalars().first()
+
+        await session.commit()
+
+        return task
+
+    def _bulk_filter(
+        self,
+        *,
+        ids: Optional[List[UUID]] = None,
+        executor_name: Optional[str] = None,
+        user: Optional[User] = None,
+        is_admin: bool = False,
+    ) -> list:
+        """
+        WHERE clauses selecting tasks by ids and/or executor name,
+        limited to tasks of `user` unless `is_admin`
+        """
+        clauses = []
+        if ids is not None:
+            clauses.append(Task.id == any_(literal(ids, ARRAY(PG_UUID(as_uuid=True)))))
+        if executor_name is not None:
+            clauses.append(
+                Task.executor_id
+                == select(User.id).where(User.name == executor_name).scalar_subquery()
+            )
+        if user is not None:
+            clauses.append(or_(Task.executor_id == user.id, literal(is_admin)))
+
+        return clauses
+
+    async def _bulk_execute(self, session: AsyncSession, stmt) -> List[UUID]:
+        result = await session.execute(
+            stmt.returning(Task.id).execution_options(synchronize_session=False)
+        )
+        ids = result.scalars().all()
+
+        await session.commit()
+
+        return ids
+
+    async def bulk_reassign(
+        self,
+        session: AsyncSession,
+        *,
+        executor: User,
+        user: User,
+        is_admin: bool = False,
+        ids: Optional[List[UUID]] = None,
+        executor_name: Optional[str] = None,
+    ) -> List[UUID]:
+        """
+        Reassign open tasks to `executor` in one UPDATE
+        """
+        stmt = (
+            update(Task)
+            .where(
+                Task.completed.is_(False),
+                *self._bulk_filter(
+                    ids=ids, executor_name=executor_name, user=user, is_admin=is_admin
+                ),
+            )
+            .values(executor_id=executor.id, version=Task.version + 1)
+        )
+
+        return await self._bulk_execute(session, stmt)
+
+    async def bulk_complete(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        is_admin: bool = False,
+        ids: Optional[List[UUID]] = None,
+        executor_name: Optional[str] = None,
+    ) -> List[UUID]:
+        """
+        Mark open tasks completed in one UPDATE
+        """
+        stmt = (
+            update(Task)
+            .where(
+                Task.completed.is_(False),
+                *self._bulk_filter(
+                    ids=ids, executor_name=executor_name, user=user, is_admin=is_admin
+                ),
+            )
+            .values(completed=True, version=Task.version + 1)
+        )
+
+        return await self._bulk_execute(session, stmt)
+
+    async def bulk_delete(
+        self,
+        session: AsyncSession,
+        *,
+        ids: Optional[List[UUID]] = None,
+        executor_name: Optional[str] = None,
+        completed: Optional[bool] = None,
+    ) -> List[UUID]:
+        """
+        Delete tasks in one DELETE
+        """
+        stmt = delete(Task).where(
+            *self._bulk_filter(ids=ids, executor_name=executor_name)
+        )
+        if completed is not None:
+            stmt = stmt.where(Task.completed.is_(completed))
+
+        return await self._bulk_execute(session, stmt)
+
+    async def allow_completed_changes(self, session: AsyncSession) -> None:
+        """
+        Let check_completed trigger pass changes of completed tasks
+        in the current transaction
+        """
+        await session.execute(select(func.set_config("shop.is_admin", "on", True)))
+
     async def delete(self, session: AsyncSession, *, task: Task) -> None:
         session.delete(task)
         await session.commit()
 
+    async def delete_expired(
+        self, session: AsyncSession, *, months: int, batch_size: int
+    ) -> int:
+        """
+        Delete tasks closed more than `months` ago in batches of `batch_size`
+        """
+        expired = (
+            select(Task.id)
+            .where(
+                Task.close_date < func.current_date() - func.make_interval(0, months)
+            )
+            .limit(batch_size)
+        )
+        stmt = delete(Task).where(Task.id.in_(expired))
+
+        total = 0
+        while True:
+            result = await session.execute(
+                stmt.execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+
+    async def create_partitions(
+        self, session: AsyncSession, *, months_ahead: int
+    ) -> None:
+        """
+        Create monthly task partitions up to `months_ahead` months from now
+        """
+        await session.execute(
+            select(func.shop.create_task_partitions(func.current_date(), months_ahead))
+        )
+        await session.commit()
+
+    async def drop_expired_partitions(
+        self, session: AsyncSession, *, months: int, lock_timeout: float
+    ) -> int:
+        """
+        Drop monthly task partitions with all tasks closed more than `months` ago.
+
+        Each partition is detached and dropped in its own transaction, which
+        gives up after waiting `lock_timeout` seconds for the task table lock
+        instead of stalling the queries queued behind it; the partition is
+        left for the next run. Tombstones of the dropped tasks are written
+        as for deleted ones, so syncing clients drop them too.
+        """
+        result = await session.execute(
+            select(func.shop.expired_task_partitions(months))
+        )
+        partitions = result.scalars().all()
+        await session.commit()
+
+        dropped = 0
+        for partition in partitions:
+            try:
+                await session.execute(
+                    select(
+                        func.set_config(
+                            "lock_timeout", f"{int(lock_timeout * 1000)}ms", True
+                        )
+                    )
+                )
+                await session.execute(select(func.shop.drop_task_partition(partition)))
+                await session.commit()
+            except DBAPIError as e:
+                await session.rollback()
+                if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+                    raise
+
+                continue
+
+            dropped += 1
+
+        return dropped
+
     async def get_types(
         self, session: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[TaskType]:
@@ -120,9 +405,9 @@ class CRUDTask:
     async def get_type(
         self, session: AsyncSession, *, task_type: str
     ) -> Optional[TaskType]:
-        stmt = select(TaskType).where(TaskType.type == task_type)
-
-        result = await session.execute(stmt)
+        result = await session.execute(
+            statements.task_type_by_type, {"type": task_type}
+        )
 
         return result.scalars().first()
 
@@ -156,9 +441,9 @@ class CRUDTask:
     async def get_priority(
         self, session: AsyncSession, *, priority: str
     ) -> Optional[TaskPriority]:
-        stmt = select(TaskPriority).where(TaskPriority.priority == priority)
-
-        result = await session.execute(stmt)
+        result = await session.execute(
+            statements.task_priority_by_priority, {"priority": priority}
+        )
 
         return result.scalars().first()
 
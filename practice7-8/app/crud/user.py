@@ -6,15 +6,25 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User, UserGroup, Group
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.crud import statements
+from app.crud.loader import get_loader
 
 
 class CRUDUser:
     async def get_by_name(self, session: AsyncSession, *, name: str) -> Optional[User]:
-        result = await session.execute(select(User).where(User.name == name))
+        result = await session.execute(statements.user_by_name, {"name": name})
 
         return result.scalars().first()
 
+    async def get_by_names(
+        self, session: AsyncSession, *, names: List[str]
+    ) -> List[Optional[User]]:
+        """
+        Users in the order of `names`, None for unknown ones, in one query
+        """
+        return await get_loader(session, User.name).load_many(names)
+
     async def get_by_group(
         self, session: AsyncSession, *, group_name: str
     ) -> List[User]:
@@ -31,8 +41,8 @@ class CRUDUser:
         return result.scalars().all()
 
     async def create(self, session: AsyncSession, *, user_in: UserCreate) -> User:
-        
-        password_hash = get_password_hash(user_in.password)
+
+        password_hash = await get_password_hash_async(user_in.password)
 
         user = User(name=user_in.name, password_hash=password_hash)
 
@@ -47,7 +57,7 @@ class CRUDUser:
         self, session: AsyncSession, *, user_obj: User, new_password: str
     ) -> User:
 
-        user_obj.password_hash = get_password_hash(new_password)
+        user_obj.password_hash = await get_password_hash_async(new_password)
 
         session.add(user_obj)
 
@@ -1,5 +1,225 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+import asyncio
+import itertools
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.settings import settings
 
-engine = create_async_engine(settings.POSTGRES_DSN)
\ No newline at end of file
+logger = logging.getLogger("app.db")
+
+REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self.lock = asyncio.Lock()
+
+
+class ReplicaRouter:
+    """
+    Route reads to a replica that lags no more than `max_lag` seconds,
+    or to the primary for users who wrote in the last `sticky_for` seconds
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        *,
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float,
+        sticky_for: float,
+    ):
+        self.primary = primary
+        self.replicas = [Replica(replica) for replica in replicas]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.sticky_for = sticky_for
+        self.writes: Dict[str, float] = {}
+
+    def mark_write(self, user: str) -> None:
+        self.writes[user] = time.monotonic() + self.sticky_for
+
+    def is_sticky(self, user: str) -> bool:
+        until = self.writes.get(user)
+        if until is None:
+            return False
+
+        if until < time.monotonic():
+            self.writes.pop(user, None)
+            return False
+
+        return True
+
+    async def _check(self, replica: Replica) -> None:
+        async with replica.lock:
+            if time.monotonic() - replica.checked_at < self.check_interval:
+                return
+
+            try:
+                async with replica.engine.connect() as conn:
+                    result = await asyncio.wait_for(
+                        conn.execute(REPLICA_LAG), self.check_timeout
+                    )
+                replica.lag = float(result.scalar())
+            except Exception:
+                logger.warning(
+                    "Replica %s is unavailable",
+                    replica.engine.url.render_as_string(hide_password=True),
+                )
+                replica.lag = None
+
+            replica.checked_at = time.monotonic()
+
+    async def get_engine(self, user: Optional[str] = None) -> AsyncEngine:
+        if not self.replicas or (user and self.is_sticky(user)):
+            return self.primary
+
+        for replica in random.sample(self.replicas, len(self.replicas)):
+            if not replica.lock.locked():
+                await self._check(replica)
+
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                return replica.engine
+
+        return self.primary
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int) -> None:
+    """
+    Open up to `size` pool connections ahead of the first requests
+    """
+    connections = [
+        engine.connect() for _ in range(min(size, engine.sync_engine.pool.size()))
+    ]
+    try:
+        await asyncio.gather(*(connection.start() for connection in connections))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+
+async def ping(engine: AsyncEngine, *, timeout: float) -> float:
+    """
+    Round trip of a trivial query through the pool, in seconds
+    """
+    start = time.perf_counter()
+
+    async def _ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(_ping(), timeout)
+
+    return time.perf_counter() - start
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that knows how many checkouts are waiting for a connection
+    and for how long the oldest of them has been waiting
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters: Dict[int, float] = {}
+        self.tokens = itertools.count()
+
+    def _do_get(self):
+        token = next(self.tokens)
+        self.waiters[token] = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            del self.waiters[token]
+
+    @property
+    def waiting(self) -> int:
+        return len(self.waiters)
+
+    @property
+    def wait(self) -> float:
+        if not self.waiters:
+            return 0.0
+
+        return time.monotonic() - min(self.waiters.values())
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, float]:
+    pool = engine.sync_engine.pool
+
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "usage": pool.checkedout() / max(1, pool.size()),
+        "waiting": pool.waiting,
+        "wait": pool.wait,
+    }
+
+
+# each server process gets its share of the connection budget
+POOL_OPTIONS = dict(
+    poolclass=MonitoredQueuePool,
+    pool_size=max(
+        settings.POSTGRES_POOL_MIN_SIZE,
+        settings.POSTGRES_POOL_BUDGET // (settings.APP_WORKERS or 1),
+    ),
+    max_overflow=0,
+    pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+    query_cache_size=settings.POSTGRES_QUERY_CACHE_SIZE,
+)
+
+# prepared statements cached per connection by the asyncpg dialect
+CONNECT_ARGS = dict(
+    prepared_statement_cache_size=settings.POSTGRES_STATEMENT_CACHE_SIZE,
+)
+
+engine = create_async_engine(
+    settings.POSTGRES_DSN, connect_args=CONNECT_ARGS, **POOL_OPTIONS
+)
+
+replicas = ReplicaRouter(
+    engine,
+    [
+        create_async_engine(
+            dsn,
+            connect_args={**CONNECT_ARGS, "timeout": settings.REPLICA_CHECK_TIMEOUT},
+            **POOL_OPTIONS,
+        )
+        for dsn in settings.POSTGRES_REPLICA_DSNS
+    ],
+    max_lag=settings.REPLICA_MAX_LAG,
+    check_interval=settings.REPLICA_CHECK_INTERVAL,
+    check_timeout=settings.REPLICA_CHECK_TIMEOUT,
+    sticky_for=settings.REPLICA_STICKY_FOR,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_write(session: Session) -> None:
+    user = session.info.get("user")
+    if user:
+        replicas.mark_write(user)
@@ -1,16 +1,149 @@
+import logging
+
 from fastapi import FastAPI
-from asyncpg.connection import connect
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api import include_api_routers
+from app.api.idempotency import IdempotencyMiddleware
+from app.core import security
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import registry
+from app.core.monitoring import loop_lag
+from app.core.rate_limit import MemoryRateLimitBackend, RateLimitMiddleware
 from app.core.settings import settings
-from app.api import api_router
+from app.crud.contract import crud_contract
+from app.crud.task import crud_task
+from app.db import engine, ping, pool_stats, replicas, warm_up_pool
+from app.notifications import task_changes
+
+logger = logging.getLogger("app.main")
 
 app = FastAPI()
-app.include_router(api_router, prefix="/api")
-    
-if __name__ == '__main__':
+app.add_middleware(
+    IdempotencyMiddleware,
+    routes=settings.IDEMPOTENCY_ROUTES,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+app.add_middleware(
+    AdmissionMiddleware,
+    engine=engine,
+    expensive=settings.ADMISSION_EXPENSIVE_ROUTES,
+    max_pool_waiting=settings.ADMISSION_MAX_POOL_WAITING,
+    max_pool_wait=settings.ADMISSION_MAX_POOL_WAIT,
+    max_expensive=settings.ADMISSION_MAX_EXPENSIVE,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
+app.add_middleware(
+    RateLimitMiddleware,
+    limits=settings.RATE_LIMITS,
+    default=settings.RATE_LIMIT_DEFAULT,
+    backend=MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_BUCKETS),
+)
+include_api_routers(app)
+
+
+async def warm_up_reference_data() -> None:
+    """
+    Read the task types, priorities and contract types that task and
+    contract writes look up by name, so the lookup statements are compiled
+    and the rows cached by the database before the first request
+    """
+    async with AsyncSession(engine) as session:
+        for task_type in await crud_task.get_types(session):
+            await crud_task.get_type(session, task_type=task_type.type)
+        for priority in await crud_task.get_priorities(session):
+            await crud_task.get_priority(session, priority=priority.priority)
+        for contract_type in await crud_contract.get_types(session):
+            await crud_contract.get_type(session, type_=contract_type.type)
+
+
+@app.on_event("startup")
+async def warm_up() -> None:
+    loop_lag.start()
+    task_changes.start()
+    security.warm_up()
+
+    try:
+        await warm_up_pool(engine, settings.POSTGRES_POOL_WARM)
+    except Exception:
+        logger.warning("Can not warm up the connection pool", exc_info=True)
+
+    try:
+        await warm_up_reference_data()
+    except Exception:
+        logger.warning("Can not warm up reference data", exc_info=True)
+
+
+@app.on_event("shutdown")
+async def dispose_engines() -> None:
+    await loop_lag.stop()
+    await task_changes.stop()
+    await replicas.dispose()
+    await engine.dispose()
+
+
+@app.get("/health/live", tags=["health"])
+async def health_live():
+    return {"status": "ok", "loop_lag": loop_lag.lag}
+
+
+@app.get("/health/ready", tags=["health"])
+async def health_ready():
+    """
+    Fail when the database is unreachable or slow, or the worker is saturated
+    """
+    try:
+        db_latency = await ping(engine, timeout=settings.HEALTH_DB_TIMEOUT)
+    except Exception:
+        logger.warning("Database ping failed", exc_info=True)
+        db_latency = None
+
+    pool = pool_stats(engine)
+    bcrypt_queue = security.bcrypt_executor.queue_depth
+
+    failed = [
+        check
+        for check, ok in (
+            ("db", db_latency is not None),
+            ("db_latency", (db_latency or 0) <= settings.HEALTH_MAX_DB_LATENCY),
+            ("pool", pool["waiting"] <= settings.HEALTH_MAX_POOL_WAITING),
+            ("loop_lag", loop_lag.lag <= settings.HEALTH_MAX_LOOP_LAG),
+            ("bcrypt_queue", bcrypt_queue <= settings.HEALTH_MAX_BCRYPT_QUEUE),
+        )
+        if not ok
+    ]
+
+    return JSONResponse(
+        {
+            "status": "fail" if failed else "ok",
+            "failed": failed,
+            "db_latency": db_latency,
+            "pool": pool,
+            "loop_lag": loop_lag.lag,
+            "bcrypt_queue": bcrypt_queue,
+        },
+        status_code=503 if failed else 200,
+    )
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
     try:
         import uvicorn
     except ImportError:
         pass
     else:
-        uvicorn.run(app, host=settings.APP_HOST, port=settings.APP_PORT)
\ No newline at end of file
+        uvicorn.run(app, host=settings.APP_HOST, port=settings.APP_PORT)
@@ -16,10 +16,15 @@ from sqlalchemy import (
     Numeric,
     DateTime,
     Boolean,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    FetchedValue,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID, TEXT
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, TEXT, JSONB
 
-from sqlalchemy.orm import as_declarative, declared_attr
+from sqlalchemy.orm import as_declarative, declared_attr, relationship
 
 convention = {
     "ix": "ix__%(column_0_N_name)s",
@@ -47,20 +52,30 @@ _T_TableExtra = Union[
 class Base:
     __extra__: Tuple[Any, ...]
     __schema__: str = SCHEMA
+    __partition_by__: Optional[str] = None
 
     def __init_subclass__(
-        cls, *args, extra: Optional[List[_T_TableExtra]] = None, **kwargs
+        cls,
+        *args,
+        extra: Optional[List[_T_TableExtra]] = None,
+        partition_by: Optional[str] = None,
+        **kwargs,
     ) -> None:
         if extra is None:
             extra = []
 
         cls.__extra__ = tuple(obj(cls) if callable(obj) else obj for obj in extra)
+        cls.__partition_by__ = partition_by
 
     @declared_attr
     def __table_args__(cls):
+        kwargs = {"schema": cls.__schema__}
+        if cls.__partition_by__:
+            kwargs["postgresql_partition_by"] = cls.__partition_by__
+
         return (
             *cls.__extra__,
-            {"schema": cls.__schema__},
+            kwargs,
         )
 
 
@@ -90,7 +105,7 @@ class UserGroup(Base, extra=[PrimaryKeyConstraint("user_id", "group_id")]):
     group_id = Column(UUID(as_uuid=True), nullable=False)
 
 
-class Organization(Base):
+class Organization(Base, extra=[Index("ix__organization__updated_at", "updated_at")]):
     __tablename__ = "organization"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -98,6 +113,15 @@ class Organization(Base):
     location = Column(String(50), nullable=False, index=True)
     postal_code = Column(String(20), nullable=True)
     first_contract_date = Column(Date, nullable=True)
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("now()"),
+        server_onupdate=FetchedValue(),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class ContactPerson(
@@ -105,6 +129,7 @@ class ContactPerson(
     extra=[
         UniqueConstraint("first_name", "second_name", "email"),
         Index("first_name", "second_name"),
+        Index("ix__contact_person__updated_at", "updated_at"),
     ],
 ):
     __tablename__ = "contact_person"
@@ -123,6 +148,12 @@ class ContactPerson(
         ),
         nullable=False,
     )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("now()"),
+        server_onupdate=FetchedValue(),
+    )
 
 
 class EquipmentPosition(Base):
@@ -149,8 +180,32 @@ class EquipmentBalance(Base):
     )
     serial_number = Column(String(100), nullable=False, unique=True)
 
+    position = relationship("EquipmentPosition", lazy="raise")
+
+
+class EquipmentStock(Base):
+    """
+    Units per equipment position, kept by the equipment stock triggers
+    """
+
+    __tablename__ = "equipment_stock"
+
+    position_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(
+            f"{SCHEMA}.equipment_positions.id",
+            ondelete="CASCADE",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        primary_key=True,
+    )
+    total = Column(Integer, nullable=False, server_default=text("0"))
+    # units linked to at least one contract
+    assigned = Column(Integer, nullable=False, server_default=text("0"))
+
 
-class Contract(Base):
+class Contract(Base, extra=[Index("ix__contract__updated_at", "updated_at")]):
     __tablename__ = "contract"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -174,6 +229,26 @@ class Contract(Base):
         ),
         nullable=False,
     )
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("now()"),
+        server_onupdate=FetchedValue(),
+    )
+
+    organization = relationship("Organization", lazy="raise")
+    type = relationship("ContractType", lazy="raise")
+    # written with bulk statements on contract_equipment, see CRUDContract
+    equipment = relationship(
+        "EquipmentBalance",
+        secondary=lambda: ContractEquipment.__table__,
+        order_by="EquipmentBalance.serial_number",
+        viewonly=True,
+        lazy="raise",
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class ContractType(Base):
@@ -208,10 +283,17 @@ class ContractEquipment(
     )
 
 
-class Task(Base):
+class Task(
+    Base,
+    extra=[
+        PrimaryKeyConstraint("id", "open_date"),
+        Index("ix__task__updated_at", "updated_at"),
+    ],
+    partition_by="RANGE (open_date)",
+):
     __tablename__ = "task"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid4)
     title = Column(String(100), nullable=False)
     description = Column(TEXT, nullable=True)
     priority_id = Column(
@@ -233,7 +315,7 @@ class Task(Base):
         nullable=False,
     )
     open_date = Column(Date, nullable=False, default=date.today)
-    close_date = Column(Date, nullable=True)
+    close_date = Column(Date, nullable=True, index=True)
     due_date = Column(Date, nullable=True)
     completed = Column(Boolean, default=False, nullable=False)
     author_id = Column(
@@ -272,6 +354,28 @@ class Task(Base):
         ),
         nullable=False,
     )
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("now()"),
+        server_onupdate=FetchedValue(),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class TaskKey(Base, extra=[Index("ix__task_key__open_date", "open_date")]):
+    """
+    Partition key of every task, written by the record_task_key triggers.
+    Keeps task ids unique across partitions and lets lookups by id read
+    a single partition.
+    """
+
+    __tablename__ = "task_key"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    open_date = Column(Date, nullable=False)
 
 
 class TaskType(Base):
@@ -286,3 +390,100 @@ class TaskPriority(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     priority = Column(String(25), nullable=False, unique=True)
+
+
+class Job(
+    Base,
+    extra=[
+        Index(
+            "ix__job__queued_created_at",
+            "created_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+    ],
+):
+    __tablename__ = "job"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    kind = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    params = Column(JSONB, nullable=False)
+    result = Column(JSONB, nullable=True)
+    error = Column(TEXT, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    owner_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(
+            f"{SCHEMA}.user.id",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        nullable=False,
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ReportSnapshot(
+    Base, extra=[UniqueConstraint("user_id", "start_date", "end_date")]
+):
+    __tablename__ = "report_snapshot"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(
+            f"{SCHEMA}.user.id",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        nullable=False,
+    )
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    task_count = Column(Integer, nullable=False)
+    completed_task_count = Column(Integer, nullable=False)
+    completed_out_of_date_task_count = Column(Integer, nullable=False)
+    not_completed_task_count = Column(Integer, nullable=False)
+    not_completed_out_of_date_task_count = Column(Integer, nullable=False)
+    as_of = Column(DateTime, nullable=False, default=datetime.now)
+
+
+class Tombstone(Base, extra=[Index("ix__tombstone__deleted_at", "deleted_at")]):
+    """
+    Deleted rows, written by the record_tombstone triggers
+    """
+
+    __tablename__ = "tombstone"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    entity = Column(String(30), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    # users allowed to see the deleted row, NULL for everyone
+    visible_to = Column(ARRAY(UUID(as_uuid=True)), nullable=True)
+    deleted_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+
+class IdempotencyKey(
+    Base,
+    extra=[
+        PrimaryKeyConstraint("owner", "key"),
+        Index("ix__idempotency_key__created_at", "created_at"),
+    ],
+):
+    """
+    Responses of POST requests sent with an Idempotency-Key header
+    """
+
+    __tablename__ = "idempotency_key"
+
+    owner = Column(String(50), nullable=False)
+    key = Column(String(255), nullable=False)
+    # sha256 of the method, path, query and body of the first request
+    request_hash = Column(LargeBinary, nullable=False)
+    # NULL while the first request is being served
+    status_code = Column(SmallInteger, nullable=True)
+    headers = Column(JSONB, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=text("now()"))
@@ -0,0 +1,145 @@
+"""
+Task change feed.
+
+The task_notify_change trigger sends NOTIFY on every task write. Each
+worker holds one LISTEN connection outside the pool and fans the events
+out to the subscribers allowed to see the task.
+"""
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.engine import make_url
+
+from app.core.metrics import registry
+from app.core.settings import settings
+
+CHANNEL = "task_changes"
+
+logger = logging.getLogger("app.notifications")
+
+subscribers_gauge = registry.gauge(
+    "task_events_subscribers", "Clients subscribed to task changes"
+)
+events_total = registry.counter(
+    "task_events_total", "Task change notifications received"
+)
+
+
+class Subscription:
+    def __init__(self, user_id: UUID, queue_size: int):
+        self.user_id = str(user_id)
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.missed = False
+
+    def can_see(self, event: dict) -> bool:
+        return self.user_id in (
+            event.get("executor_id"),
+            event.get("author_id"),
+            event.get("old_executor_id"),
+        )
+
+    def put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # the client has to reload its tasks anyway
+            self.missed = True
+
+    async def get(self) -> Optional[dict]:
+        """
+        Next event, None when events were dropped since the last call
+        """
+        if self.missed:
+            self.missed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return None
+
+        return await self.queue.get()
+
+
+class TaskChangeListener:
+    """
+    LISTEN on `channel` with a dedicated connection, reconnecting
+    after `reconnect_delay` when it is lost
+    """
+
+    def __init__(self, dsn: str, *, queue_size: int, reconnect_delay: float):
+        url = make_url(dsn).set(drivername="postgresql")
+        self.dsn = url.render_as_string(hide_password=False)
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.subscriptions: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def _notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        events_total.inc()
+        event = json.loads(payload)
+
+        for subscription in self.subscriptions:
+            if subscription.can_see(event):
+                subscription.put(event)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception:
+                logger.warning("Can not connect the task listener", exc_info=True)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(CHANNEL, self._notify)
+                await lost.wait()
+                logger.warning("Task listener connection lost")
+            finally:
+                await connection.close()
+
+            # events sent while reconnecting are lost
+            for subscription in self.subscriptions:
+                subscription.missed = True
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+        self.task = None
+
+    @contextmanager
+    def subscribe(self, user_id: UUID) -> Iterator[Subscription]:
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscriptions.add(subscription)
+        subscribers_gauge.set(len(self.subscriptions))
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
+            subscribers_gauge.set(len(self.subscriptions))
+
+
+task_changes = TaskChangeListener(
+    settings.POSTGRES_DSN,
+    queue_size=settings.TASK_EVENTS_QUEUE_SIZE,
+    reconnect_delay=settings.TASK_EVENTS_RECONNECT_DELAY,
+)
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.contact_person import ContactPersonOut
+from app.schemas.contract import ContractOut
+from app.schemas.organization import OrganizationOut
+from app.schemas.task import TaskOut
+
+
+class TombstoneOut(BaseModel):
+    class Config:
+        orm_mode = True
+
+    entity: str
+    entity_id: UUID
+    deleted_at: datetime
+
+
+class FullSyncPosition(BaseModel):
+    """
+    Where a paged full sync stopped: the time its pages are read as of and
+    the last id returned of every kind not complete yet
+    """
+
+    until: datetime
+    after: Dict[str, UUID]
+
+
+class ChangesOut(BaseModel):
+    cursor: datetime
+    full: bool
+    organizations: List[OrganizationOut]
+    contact_persons: List[ContactPersonOut]
+    contracts: List[ContractOut]
+    tasks: List[TaskOut]
+    deleted: List[TombstoneOut]
+    continuation: Optional[str] = None
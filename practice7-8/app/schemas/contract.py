@@ -1,13 +1,15 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from app.schemas.equipment import EquipmentOut, EquipmentPositionOut
+from app.schemas.organization import OrganizationOut
+
 
 class ContractBase(BaseModel):
     name: str
     description: str
-    price: float
 
 
 class ContractCreate(ContractBase):
@@ -18,7 +20,7 @@ class ContractCreate(ContractBase):
 class ContractUpdate(ContractBase):
     name: Optional[str]
     description: Optional[str]
-    price: Optional[float]
+    version: Optional[int] = Field(None, exclude=True)
 
 
 class ContractOut(ContractBase):
@@ -28,6 +30,7 @@ class ContractOut(ContractBase):
     id: UUID
     organization_id: UUID
     type_id: UUID
+    version: int
 
 
 class ContractTypeBase(BaseModel):
@@ -47,3 +50,17 @@ class ContractTypeOut(ContractTypeBase):
         orm_mode = True
 
     id: UUID
+
+
+class ContractEquipmentIn(BaseModel):
+    serial_numbers: List[str] = Field(..., min_items=1)
+
+
+class ContractEquipmentOut(EquipmentOut):
+    position: EquipmentPositionOut
+
+
+class ContractDetailOut(ContractOut):
+    organization: OrganizationOut
+    type_: ContractTypeOut = Field(alias="type")
+    equipment: List[ContractEquipmentOut]
@@ -39,4 +39,17 @@ class EquipmentOut(EquipmentBase):
         orm_mode = True
     
     id: UUID
-    position_id: UUID
\ No newline at end of file
+    position_id: UUID
+
+
+class EquipmentStockOut(BaseModel):
+    class Config:
+        orm_mode = True
+
+    position_id: UUID
+    name: str
+    price: float
+    total: int
+    assigned: int
+    available: int
+    value: float
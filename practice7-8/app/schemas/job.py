@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class JobKind(str, Enum):
+    report = "report"
+    export = "export"
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class JobParams(BaseModel):
+    user: Optional[str]
+    start_date: date
+    end_date: date = Field(default_factory=date.today)
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    params: JobParams
+
+
+class JobOut(BaseModel):
+    class Config:
+        orm_mode = True
+
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    attempts: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
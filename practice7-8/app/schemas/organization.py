@@ -2,7 +2,7 @@ from uuid import UUID
 from typing import Optional
 from datetime import date
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class OrganizationBase(BaseModel):
@@ -18,6 +18,7 @@ class OrganizationCreate(OrganizationBase):
 class OrganizationUpdate(OrganizationBase):
     name: Optional[str]
     location: Optional[str]
+    version: Optional[int] = Field(None, exclude=True)
 
 
 class OrganizationOut(OrganizationBase):
@@ -26,3 +27,4 @@ class OrganizationOut(OrganizationBase):
 
     id: UUID
     first_contract_date: Optional[date]
+    version: int
@@ -0,0 +1,16 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.schemas.contact_person import ContactPersonOut
+from app.schemas.contract import ContractOut, ContractTypeOut
+from app.schemas.organization import OrganizationOut
+from app.schemas.task import TaskOut
+
+
+class OrganizationOverviewOut(BaseModel):
+    organization: OrganizationOut
+    contact_persons: List[ContactPersonOut]
+    contracts: List[ContractOut]
+    contract_types: List[ContractTypeOut]
+    open_tasks: List[TaskOut]
@@ -1,4 +1,5 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -12,3 +13,4 @@ class ReportOut(BaseModel):
     completed_out_of_date_task_count: int
     not_completed_task_count: int
     not_completed_out_of_date_task_count: int
+    as_of: Optional[datetime]
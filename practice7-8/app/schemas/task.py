@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from datetime import date
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, root_validator
 
 
 class BaseTask(BaseModel):
@@ -26,6 +26,7 @@ class TaskUpdate(BaseTask):
     priority: Optional[str] = Field(..., exclude=True)
     executor_name: Optional[str] = Field(..., exclude=True)
     contact_person_id: Optional[UUID]
+    version: Optional[int] = Field(None, exclude=True)
 
 
 class TaskOut(BaseTask):
@@ -40,6 +41,31 @@ class TaskOut(BaseTask):
     priority_id: UUID
     author_id: UUID
     executor_id: UUID
+    version: int
+
+
+class TaskBulkFilter(BaseModel):
+    ids: Optional[List[UUID]]
+    executor_name: Optional[str]
+
+    @root_validator
+    def check_filter(cls, values):
+        if values.get("ids") is None and values.get("executor_name") is None:
+            raise ValueError("ids or executor_name is required")
+
+        return values
+
+
+class TaskBulkReassign(TaskBulkFilter):
+    new_executor_name: str
+
+
+class TaskBulkDelete(TaskBulkFilter):
+    completed: Optional[bool]
+
+
+class TaskBulkOut(BaseModel):
+    ids: List[UUID]
 
 
 class TaskTypeBase(BaseModel):
@@ -0,0 +1,42 @@
+"""
+Production entry point, one server process per worker:
+
+    python -m app.server
+"""
+import os
+
+import uvicorn
+
+from app.core.settings import settings
+
+
+def main() -> None:
+    # every worker needs its POSTGRES_POOL_MIN_SIZE share of the budget
+    workers = settings.APP_WORKERS or max(
+        1,
+        min(
+            os.cpu_count() or 1,
+            settings.POSTGRES_POOL_BUDGET // settings.POSTGRES_POOL_MIN_SIZE,
+        ),
+    )
+
+    # worker processes build their own settings from the environment
+    os.environ["APP_WORKERS"] = str(workers)
+    os.environ.setdefault("SECRET_KEY", settings.SECRET_KEY)
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.APP_HOST,
+        port=settings.APP_PORT,
+        workers=workers,
+        loop=settings.APP_LOOP,
+        http=settings.APP_HTTP,
+        timeout_keep_alive=settings.APP_KEEP_ALIVE,
+        backlog=settings.APP_BACKLOG,
+        limit_concurrency=settings.APP_LIMIT_CONCURRENCY,
+        limit_max_requests=settings.APP_LIMIT_MAX_REQUESTS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import signal
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.crud.changes import crud_changes
+from app.crud.idempotency import crud_idempotency
+from app.crud.job import crud_job
+from app.crud.report import crud_report, get_standard_periods
+from app.crud.task import crud_task
+from app.crud.user import crud_user
+from app.db import engine
+from app.models import Job, User
+from app.schemas.job import JobKind, JobParams
+from app.schemas.task import TaskOut
+
+logger = logging.getLogger("app.worker")
+
+JobHandler = Callable[[AsyncSession, JobParams], Awaitable[Any]]
+PeriodicTask = Callable[[AsyncSession], Awaitable[None]]
+
+
+async def _get_user(session: AsyncSession, params: JobParams) -> User:
+    user = await crud_user.get_by_name(session, name=params.user)
+    if not user:
+        raise LookupError(f"User {params.user} not found")
+
+    return user
+
+
+async def run_report(session: AsyncSession, params: JobParams) -> Any:
+    user = await _get_user(session, params)
+
+    report = await crud_report.get(
+        session,
+        user=user,
+        start_date=params.start_date,
+        end_date=params.end_date,
+    )
+
+    return jsonable_encoder(report)
+
+
+async def run_export(session: AsyncSession, params: JobParams) -> Any:
+    user = await _get_user(session, params)
+
+    tasks = await crud_task.get_by_id_and_date_period(
+        session,
+        user=user,
+        start_date=params.start_date,
+        end_date=params.end_date,
+    )
+
+    return jsonable_encoder([TaskOut.from_orm(task) for task in tasks])
+
+
+async def requeue_stale_jobs(session: AsyncSession) -> None:
+    await crud_job.requeue_stale(
+        session,
+        timeout=timedelta(seconds=settings.JOB_TIMEOUT + settings.JOB_REQUEUE_GRACE),
+    )
+
+
+async def precompute_reports(session: AsyncSession) -> None:
+    since = datetime.now() - timedelta(seconds=settings.REPORT_SNAPSHOT_MAX_AGE)
+    fresh = set(await crud_report.get_fresh_snapshot_keys(session, since=since))
+
+    executors = await crud_report.get_executors(session)
+
+    for start_date, end_date in get_standard_periods(date.today()):
+        for user in executors:
+            if (user.id, start_date, end_date) in fresh:
+                continue
+
+            report = await crud_report.get(
+                session,
+                user=user,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            await crud_report.save_snapshot(session, user=user, report=report)
+
+
+async def create_task_partitions(session: AsyncSession) -> None:
+    await crud_task.create_partitions(
+        session, months_ahead=settings.TASK_PARTITION_MONTHS_AHEAD
+    )
+
+
+async def expire_completed_tasks(session: AsyncSession) -> None:
+    dropped = await crud_task.drop_expired_partitions(
+        session,
+        months=settings.TASK_RETENTION_MONTHS,
+        lock_timeout=settings.TASK_PARTITION_LOCK_TIMEOUT,
+    )
+    if dropped:
+        logger.info("Dropped %s expired task partitions", dropped)
+
+    deleted = await crud_task.delete_expired(
+        session,
+        months=settings.TASK_RETENTION_MONTHS,
+        batch_size=settings.TASK_RETENTION_BATCH_SIZE,
+    )
+    if deleted:
+        logger.info("Deleted %s expired tasks", deleted)
+
+
+async def purge_tombstones(session: AsyncSession) -> None:
+    before = datetime.now() - timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION)
+    purged = await crud_changes.purge_tombstones(session, before=before)
+    if purged:
+        logger.info("Purged %s tombstones", purged)
+
+
+async def purge_idempotency_keys(session: AsyncSession) -> None:
+    before = datetime.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    purged = await crud_idempotency.purge(session, before=before)
+    if purged:
+        logger.info("Purged %s idempotency keys", purged)
+
+
+JOB_HANDLERS: Dict[JobKind, JobHandler] = {
+    JobKind.report: run_report,
+    JobKind.export: run_export,
+}
+
+PERIODIC_TASKS: List[Tuple[float, PeriodicTask]] = [
+    (settings.JOB_TIMEOUT, requeue_stale_jobs),
+    (settings.REPORT_SNAPSHOT_INTERVAL, precompute_reports),
+    (settings.TASK_PARTITION_INTERVAL, create_task_partitions),
+    (settings.TASK_RETENTION_INTERVAL, expire_completed_tasks),
+    (settings.SYNC_TOMBSTONE_INTERVAL, purge_tombstones),
+    (settings.IDEMPOTENCY_PURGE_INTERVAL, purge_idempotency_keys),
+]
+
+
+class Worker:
+    def __init__(self, *, concurrency: int, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stopping = asyncio.Event()
+        self.running: Set[asyncio.Task] = set()
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    async def _sleep(self, delay: float) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_job(self, job: Job) -> None:
+        try:
+            if job.attempts > settings.JOB_MAX_ATTEMPTS:
+                raise RuntimeError("Job attempts exceeded")
+
+            handler = JOB_HANDLERS[JobKind(job.kind)]
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                # give up before requeue_stale hands the job to another worker
+                try:
+                    result = await asyncio.wait_for(
+                        handler(session, JobParams(**job.params)), settings.JOB_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    raise RuntimeError("Job timed out") from None
+
+                if not await crud_job.finish(session, job=job, result=result):
+                    logger.warning("Job %s was requeued, result dropped", job.id)
+
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                if not await crud_job.fail(
+                    session,
+                    job=job,
+                    error=str(e),
+                    max_attempts=settings.JOB_MAX_ATTEMPTS,
+                ):
+                    logger.warning("Job %s was requeued, failure dropped", job.id)
+
+        finally:
+            self.semaphore.release()
+
+    async def _run_periodic(self, interval: float, func: PeriodicTask) -> None:
+        while not self.stopping.is_set():
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    await func(session)
+            except Exception:
+                logger.exception("Periodic task %s failed", func.__name__)
+
+            await self._sleep(interval)
+
+    async def serve(self) -> None:
+        periodic = [
+            asyncio.create_task(self._run_periodic(interval, func))
+            for interval, func in PERIODIC_TASKS
+        ]
+
+        while not self.stopping.is_set():
+            await self.semaphore.acquire()
+            # stop was requested while every slot was busy
+            if self.stopping.is_set():
+                self.semaphore.release()
+                break
+
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    job = await crud_job.claim(session)
+            except Exception:
+                logger.exception("Can not claim job")
+                job = None
+
+            if job is None:
+                self.semaphore.release()
+                await self._sleep(self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._run_job(job))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+        await asyncio.gather(*self.running, *periodic)
+
+
+async def main() -> None:
+    worker = Worker(
+        concurrency=settings.WORKER_CONCURRENCY,
+        poll_interval=settings.WORKER_POLL_INTERVAL,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.serve()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
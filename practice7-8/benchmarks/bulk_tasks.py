@@ -0,0 +1,163 @@
+"""
+Reassign, complete and delete the open tasks of one executor task by task,
+the way a client looping over PUT /task/{id} does (lookup, update, commit
+per task), against the set-based CRUDTask.bulk_* statements.
+
+Runs against the migrated application database and removes the rows it
+creates.
+
+    python -m benchmarks.bulk_tasks --rows 10000
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.settings import settings
+from app.crud.task import crud_task
+from app.crud.user import crud_user
+from app.schemas.task import TaskUpdate
+
+PREFIX = "bench_bulk"
+
+SETUP = [
+    f"""
+    INSERT INTO shop.user (id, name, password_hash, created_at, updated_at)
+    SELECT gen_random_uuid(), '{PREFIX}_' || name, '-', now(), now()
+    FROM unnest(ARRAY['from', 'to']) AS name
+    """,
+    f"""
+    INSERT INTO shop.task_type (id, type) VALUES (gen_random_uuid(), '{PREFIX}')
+    """,
+    f"""
+    INSERT INTO shop.task_priority (id, priority)
+    VALUES (gen_random_uuid(), '{PREFIX}')
+    """,
+    f"""
+    INSERT INTO shop.organization (id, name, location)
+    VALUES (gen_random_uuid(), '{PREFIX}', '{PREFIX}')
+    """,
+    f"""
+    INSERT INTO shop.contact_person
+        (id, first_name, second_name, email, organization_id)
+    SELECT gen_random_uuid(), '{PREFIX}', '{PREFIX}', '{PREFIX}', id
+    FROM shop.organization WHERE name = '{PREFIX}'
+    """,
+]
+
+FILL = text(
+    f"""
+    INSERT INTO shop.task (
+        id, title, priority_id, type_id, open_date, completed,
+        author_id, executor_id, contact_person_id
+    )
+    SELECT
+        gen_random_uuid(),
+        '{PREFIX} ' || i,
+        (SELECT id FROM shop.task_priority WHERE priority = '{PREFIX}'),
+        (SELECT id FROM shop.task_type WHERE type = '{PREFIX}'),
+        current_date,
+        false,
+        u.id,
+        u.id,
+        (SELECT id FROM shop.contact_person WHERE first_name = '{PREFIX}')
+    FROM generate_series(1, :rows) AS i, shop.user AS u
+    WHERE u.name = '{PREFIX}_from'
+    RETURNING id
+    """
+)
+
+TEARDOWN = [
+    f"""
+    DELETE FROM shop.task WHERE executor_id IN (
+        SELECT id FROM shop.user WHERE name LIKE '{PREFIX}_%'
+    )
+    """,
+    f"DELETE FROM shop.contact_person WHERE first_name = '{PREFIX}'",
+    f"DELETE FROM shop.organization WHERE name = '{PREFIX}'",
+    f"DELETE FROM shop.task_priority WHERE priority = '{PREFIX}'",
+    f"DELETE FROM shop.task_type WHERE type = '{PREFIX}'",
+    f"DELETE FROM shop.user WHERE name LIKE '{PREFIX}_%'",
+]
+
+
+async def fill(session: AsyncSession, rows: int) -> List[UUID]:
+    result = await session.execute(FILL, {"rows": rows})
+    ids = result.scalars().all()
+    await session.commit()
+
+    return ids
+
+
+async def per_task(session: AsyncSession, ids: List[UUID]) -> None:
+    executor = await crud_user.get_by_name(session, name=f"{PREFIX}_to")
+    task_in = TaskUpdate(type=None, priority=None, executor_name=None)
+
+    for id in ids:
+        task = await crud_task.get_by_id(session, id=id)
+        await crud_task.update(session, task=task, task_in=task_in, executor=executor)
+    for id in ids:
+        task = await crud_task.get_by_id(session, id=id)
+        task.completed = True
+        await crud_task.update(session, task=task, task_in=task_in)
+    for id in ids:
+        task = await crud_task.get_by_id(session, id=id)
+        await session.delete(task)
+        await session.commit()
+
+
+async def bulk(session: AsyncSession, ids: List[UUID]) -> None:
+    user = await crud_user.get_by_name(session, name=f"{PREFIX}_from")
+    executor = await crud_user.get_by_name(session, name=f"{PREFIX}_to")
+
+    reassigned = await crud_task.bulk_reassign(
+        session, executor=executor, user=user, ids=ids
+    )
+    completed = await crud_task.bulk_complete(
+        session, user=executor, executor_name=f"{PREFIX}_to"
+    )
+    deleted = await crud_task.bulk_delete(session, ids=ids)
+
+    assert len(reassigned) == len(completed) == len(deleted) == len(ids)
+
+
+async def main(rows: int) -> None:
+    engine = create_async_engine(settings.POSTGRES_DSN)
+
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            for stmt in SETUP:
+                await session.execute(text(stmt))
+            await session.commit()
+
+            for run in (per_task, bulk):
+                ids = await fill(session, rows)
+
+                start = time.perf_counter()
+                await run(session, ids)
+                elapsed = time.perf_counter() - start
+
+                session.expunge_all()
+                print(
+                    f"{run.__name__:8} reassign + complete + delete {rows} tasks:"
+                    f" {elapsed:7.2f}s"
+                )
+
+    finally:
+        async with engine.begin() as conn:
+            for stmt in TEARDOWN:
+                await conn.execute(text(stmt))
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows))
@@ -0,0 +1,56 @@
+"""
+Import time profile of the application, best of `--repeat` cold runs:
+
+    python -m benchmarks.import_time --module app.main --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+def profile(module: str) -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+
+        times[name.strip()] = int(self_us), int(cumulative_us)
+
+    return times
+
+
+def main(module: str, top: int, repeat: int) -> None:
+    runs: List[Dict[str, Tuple[int, int]]] = [profile(module) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run[module][1])
+
+    print(f"{module}: {best[module][1] / 1000:.1f}ms (best of {repeat})")
+    print(f"{'self ms':>9} {'total ms':>9}  module")
+
+    for name, (self_us, cumulative_us) in sorted(
+        best.items(), key=lambda item: item[1][1], reverse=True
+    )[:top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.module, args.top, args.repeat)
@@ -0,0 +1,111 @@
+"""
+Bytes and CPU of a task list page in each list format (rows, rows without
+nulls, columnar) and encoding (identity, gzip and, when installed, brotli
+at several levels).
+
+    python -m benchmarks.response_size --items 100 --repeat 50
+"""
+import argparse
+import gzip
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.formats import ListFormat, ListOptions
+from app.core.compression import brotli
+from app.schemas.task import TaskOut
+
+FORMATS = {
+    "rows": ListOptions(ListFormat.rows),
+    "rows, exclude_none": ListOptions(ListFormat.rows, exclude_none=True),
+    "columnar": ListOptions(ListFormat.columnar),
+}
+
+ENCODINGS = {
+    "identity": lambda body: body,
+    **{
+        f"gzip {level}": lambda body, level=level: gzip.compress(body, level)
+        for level in (1, 5, 9)
+    },
+}
+if brotli is not None:
+    ENCODINGS.update(
+        {
+            f"br {quality}": lambda body, quality=quality: brotli.compress(
+                body, quality=quality
+            )
+            for quality in (1, 4, 11)
+        }
+    )
+
+
+def make_tasks(items: int) -> list:
+    users = [uuid4() for _ in range(5)]
+    today = date.today()
+
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            title=f"Task {i}",
+            description=None if i % 3 else f"Description of task {i}",
+            due_date=None if i % 2 else today + timedelta(days=i % 30),
+            contract_id=None if i % 4 else uuid4(),
+            contact_person_id=uuid4(),
+            close_date=None if i % 5 else today,
+            open_date=today - timedelta(days=i % 60),
+            completed=i % 5 == 0,
+            type_id=users[i % 2],
+            priority_id=users[i % 3],
+            author_id=users[i % 5],
+            executor_id=users[(i + 1) % 5],
+            version=1,
+        )
+        for i in range(items)
+    ]
+
+
+def measure(func, repeat: int):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+
+    return result, (time.process_time() - start) / repeat
+
+
+def main(items: int, repeat: int) -> None:
+    tasks = make_tasks(items)
+
+    print(f"{items} tasks per page, cpu per page")
+
+    _, render = measure(
+        lambda: JSONResponse(
+            jsonable_encoder([TaskOut.from_orm(task) for task in tasks])
+        ),
+        repeat,
+    )
+    print(f"response_model (jsonable_encoder): render {render * 1000:.2f}ms")
+
+    for name, options in FORMATS.items():
+        response, render = measure(lambda: options.render(tasks, TaskOut), repeat)
+        print(f"{name}: {len(response.body)} bytes, render {render * 1000:.2f}ms")
+
+        for encoding, compress in ENCODINGS.items():
+            body, cpu = measure(lambda: compress(response.body), repeat)
+            print(
+                f"    {encoding:10} {len(body):8} bytes"
+                f" {len(body) / len(response.body):6.1%}"
+                f" {cpu * 1000:8.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    main(args.items, args.repeat)
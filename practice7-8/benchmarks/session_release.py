@@ -0,0 +1,163 @@
+"""
+Connections held at a given RPS by a list endpoint whose session is closed
+in the dependency teardown (plain APIRoute) against one closed as soon as
+the endpoint returns (SessionReleasingRoute).
+
+    python -m benchmarks.session_release --rps 200 --duration 5 --rows 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from typing import AsyncGenerator, Dict, List
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from starlette.types import ASGIApp, Message
+
+from app.api.routing import SessionReleasingRoute, track_session
+from app.core.settings import settings
+
+ROWS = text(
+    "SELECT i AS id, md5(i::text) AS name, now() AS created_at "
+    "FROM generate_series(1, :rows) AS i"
+)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    created_at: datetime
+
+
+class PoolStats:
+    def __init__(self):
+        self.checked_out: Dict[int, float] = {}
+        self.peak = 0
+        self.hold_times: List[float] = []
+
+    def checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checked_out[id(dbapi_connection)] = time.perf_counter()
+        self.peak = max(self.peak, len(self.checked_out))
+
+    def checkin(self, dbapi_connection, connection_record):
+        started = self.checked_out.pop(id(dbapi_connection), None)
+        if started is not None:
+            self.hold_times.append(time.perf_counter() - started)
+
+
+async def get(app: ASGIApp, path: str) -> int:
+    """
+    Status of a GET request served by calling the app directly
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif not message.get("more_body", False):
+            response_complete.set()
+
+    await app(scope, receive, send)
+
+    return status
+
+
+def make_app(route_class: type, engine, rows: int) -> FastAPI:
+    async def get_session() -> AsyncGenerator:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            track_session(session)
+            yield session
+
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/items", response_model=List[Item])
+    async def get_items(session: AsyncSession = Depends(get_session)):
+        result = await session.execute(ROWS, {"rows": rows})
+
+        return result.mappings().all()
+
+    app = FastAPI()
+    app.include_router(router)
+
+    return app
+
+
+async def run(route_class: type, rps: int, duration: float, rows: int) -> None:
+    engine = create_async_engine(settings.POSTGRES_DSN, pool_size=100, max_overflow=0)
+    stats = PoolStats()
+    event.listen(engine.sync_engine, "checkout", stats.checkout)
+    event.listen(engine.sync_engine, "checkin", stats.checkin)
+
+    app = make_app(route_class, engine, rows)
+
+    await get(app, "/items")
+    stats.peak, stats.hold_times = 0, []
+
+    requests = []
+    start = time.perf_counter()
+    for i in range(int(rps * duration)):
+        requests.append(asyncio.create_task(get(app, "/items")))
+        await asyncio.sleep(max(0, start + (i + 1) / rps - time.perf_counter()))
+
+    statuses = await asyncio.gather(*requests)
+    elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+
+    assert all(status == 200 for status in statuses)
+
+    hold = statistics.mean(stats.hold_times)
+    print(
+        f"{route_class.__name__:22} {len(statuses) / elapsed:6.0f} rps,"
+        f" peak connections {stats.peak:3},"
+        f" mean hold {hold * 1000:6.2f}ms,"
+        f" needed at {rps} rps ~{rps * hold:.1f}"
+    )
+
+
+async def main(rps: int, duration: float, rows: int) -> None:
+    for route_class in (APIRoute, SessionReleasingRoute):
+        await run(route_class, rps, duration, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rps", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rps, args.duration, args.rows))
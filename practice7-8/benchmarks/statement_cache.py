@@ -0,0 +1,67 @@
+"""
+Per-query CPU of a user lookup built per call against the prebuilt
+statement from app.crud.statements, with and without the asyncpg
+prepared statement cache.
+
+    python -m benchmarks.statement_cache --queries 5000 --name admin
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.settings import settings
+from app.crud import statements
+from app.models import User
+
+
+async def built_per_call(session: AsyncSession, name: str) -> None:
+    result = await session.execute(select(User).where(User.name == name))
+    result.scalars().first()
+
+
+async def prebuilt(session: AsyncSession, name: str) -> None:
+    result = await session.execute(statements.user_by_name, {"name": name})
+    result.scalars().first()
+
+
+async def run(lookup, cache_size: int, queries: int, name: str) -> None:
+    engine = create_async_engine(
+        settings.POSTGRES_DSN,
+        pool_size=1,
+        connect_args=dict(prepared_statement_cache_size=cache_size),
+    )
+
+    async with AsyncSession(engine) as session:
+        for _ in range(100):
+            await lookup(session, name)
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(queries):
+            await lookup(session, name)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    await engine.dispose()
+
+    print(
+        f"{lookup.__name__:15} statement cache {cache_size:4}:"
+        f" cpu {cpu / queries * 1e6:6.1f}us/query,"
+        f" wall {wall / queries * 1e6:6.1f}us/query"
+    )
+
+
+async def main(queries: int, name: str) -> None:
+    for lookup in (built_per_call, prebuilt):
+        for cache_size in (0, settings.POSTGRES_STATEMENT_CACHE_SIZE):
+            await run(lookup, cache_size, queries, name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--name", default="admin")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.queries, args.name))
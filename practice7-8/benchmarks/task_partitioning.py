@@ -0,0 +1,207 @@
+"""
+Report latency and retention cost on a task table range-partitioned by month
+of open_date against the same table unpartitioned. Retention removes the
+same rows either way: batched DELETE by open_date or DROP of whole partitions.
+
+    python -m benchmarks.task_partitioning --rows 50000000 --months 24
+"""
+import argparse
+import asyncio
+import time
+
+import asyncpg
+
+from app.core.settings import settings
+
+SCHEMA = "bench_partitioning"
+
+CREATE_SCHEMA = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+"""
+
+COLUMNS = """
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    executor_id INT NOT NULL,
+    open_date DATE NOT NULL,
+    close_date DATE,
+    due_date DATE,
+    completed BOOLEAN NOT NULL
+"""
+
+CREATE_UNPARTITIONED = f"""
+CREATE TABLE {SCHEMA}.task ({COLUMNS}, PRIMARY KEY (id));
+"""
+
+CREATE_PARTITIONED = f"""
+CREATE TABLE {SCHEMA}.task ({COLUMNS}, PRIMARY KEY (id, open_date))
+    PARTITION BY RANGE (open_date);
+"""
+
+CREATE_PARTITION = """
+CREATE TABLE {schema}.task_{name} PARTITION OF {schema}.task
+    FOR VALUES FROM ('{start}') TO ('{end}')
+"""
+
+CREATE_INDEXES = f"""
+CREATE INDEX ON {SCHEMA}.task (executor_id, open_date);
+CREATE INDEX ON {SCHEMA}.task (open_date);
+"""
+
+FILL = f"""
+INSERT INTO {SCHEMA}.task (executor_id, open_date, close_date, due_date, completed)
+SELECT
+    i % $2,
+    open_date,
+    CASE WHEN i % 3 > 0 THEN open_date + 5 END,
+    open_date + 7,
+    i % 3 > 0
+FROM (
+    SELECT i, date_trunc('month', current_date)::date
+        - (i % ($3 * 28)) AS open_date
+    FROM generate_series(1, $1) AS i
+) AS t
+"""
+
+REPORT = f"""
+SELECT
+    count(*),
+    count(*) FILTER (WHERE completed),
+    count(*) FILTER (WHERE completed AND close_date > due_date),
+    count(*) FILTER (WHERE NOT completed),
+    count(*) FILTER (WHERE NOT completed AND due_date < current_date)
+FROM {SCHEMA}.task
+WHERE executor_id = $1 AND open_date BETWEEN $2 AND $3
+"""
+
+EXPIRE_BATCH = f"""
+DELETE FROM {SCHEMA}.task WHERE id IN (
+    SELECT id FROM {SCHEMA}.task WHERE open_date < $1 LIMIT $2
+)
+"""
+
+EXPIRED_PARTITIONS = """
+SELECT c.relname
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = $1::regclass
+    AND to_date(substring(c.relname FROM 6), 'YYYY_MM') < $2
+"""
+
+
+async def _months(conn: asyncpg.Connection, months: int) -> list:
+    return await conn.fetch(
+        """
+        SELECT
+            to_char(month, 'YYYY_MM') AS name,
+            month::date AS start,
+            (month + INTERVAL '1 month')::date AS end
+        FROM generate_series(
+            date_trunc('month', current_date) - make_interval(months => $1),
+            date_trunc('month', current_date),
+            INTERVAL '1 month'
+        ) AS month
+        """,
+        months,
+    )
+
+
+async def _prepare(
+    conn: asyncpg.Connection, rows: int, executors: int, months: int, partitioned: bool
+) -> float:
+    await conn.execute(CREATE_SCHEMA)
+
+    if partitioned:
+        await conn.execute(CREATE_PARTITIONED)
+        for month in await _months(conn, months):
+            await conn.execute(CREATE_PARTITION.format(schema=SCHEMA, **month))
+    else:
+        await conn.execute(CREATE_UNPARTITIONED)
+
+    start = time.perf_counter()
+    await conn.execute(FILL, rows, executors, months)
+    await conn.execute(CREATE_INDEXES)
+    await conn.execute(f"VACUUM ANALYZE {SCHEMA}.task")
+
+    return time.perf_counter() - start
+
+
+async def _report(conn: asyncpg.Connection, executors: int, repeat: int) -> float:
+    period = await conn.fetchrow(
+        "SELECT date_trunc('month', current_date)::date - 30 AS start,"
+        " date_trunc('month', current_date)::date - 1 AS end"
+    )
+    stmt = await conn.prepare(REPORT)
+
+    start = time.perf_counter()
+    for i in range(repeat):
+        await stmt.fetchrow(i % executors, period["start"], period["end"])
+
+    return (time.perf_counter() - start) / repeat
+
+
+async def _expire_rows(conn: asyncpg.Connection, cutoff, batch_size: int) -> float:
+    start = time.perf_counter()
+    while True:
+        status = await conn.execute(EXPIRE_BATCH, cutoff, batch_size)
+        if int(status.split()[-1]) < batch_size:
+            break
+
+    return time.perf_counter() - start
+
+
+async def _expire_partitions(conn: asyncpg.Connection, cutoff) -> float:
+    start = time.perf_counter()
+    for partition in await conn.fetch(EXPIRED_PARTITIONS, f"{SCHEMA}.task", cutoff):
+        await conn.execute(f"DROP TABLE {SCHEMA}.{partition['relname']}")
+
+    return time.perf_counter() - start
+
+
+async def main(
+    rows: int, executors: int, months: int, repeat: int, batch_size: int
+) -> None:
+    conn = await asyncpg.connect(settings.POSTGRES_DSN.replace("+asyncpg", ""))
+    cutoff = await conn.fetchval(
+        "SELECT (date_trunc('month', current_date) - make_interval(months => $1))::date",
+        months // 2,
+    )
+
+    try:
+        results = {}
+        for partitioned in (False, True):
+            fill = await _prepare(conn, rows, executors, months, partitioned)
+            report = await _report(conn, executors, repeat)
+
+            if partitioned:
+                expire = await _expire_partitions(conn, cutoff)
+            else:
+                expire = await _expire_rows(conn, cutoff, batch_size)
+
+            results[partitioned] = fill, report, expire
+
+        print(f"rows: {rows}, executors: {executors}, months: {months}")
+        for partitioned, (fill, report, expire) in results.items():
+            name = "partitioned:  " if partitioned else "unpartitioned:"
+            print(
+                f"{name} fill {fill:.1f}s, report {report * 1000:.2f}ms,"
+                f" retention {expire:.2f}s"
+            )
+
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--executors", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(args.rows, args.executors, args.months, args.repeat, args.batch_size)
+    )
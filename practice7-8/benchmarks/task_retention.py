@@ -0,0 +1,129 @@
+"""
+Bulk insert throughput into a task table with the per-row expire trigger
+from practice2-5/functions.sql against the batched retention job.
+
+    python -m benchmarks.task_retention --rows 5000 --existing 50000
+"""
+import argparse
+import asyncio
+import time
+
+import asyncpg
+
+from app.core.settings import settings
+
+SCHEMA = "bench_retention"
+
+CREATE_TABLE = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.tasks (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(100) NOT NULL,
+    open_date DATE NOT NULL DEFAULT current_date,
+    close_date DATE
+);
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION {SCHEMA}.process_expire_complited_tasks()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+    BEGIN
+        DELETE FROM {SCHEMA}.tasks WHERE close_date < current_date - INTERVAL '12 month';
+        RETURN NEW;
+    END;
+$$;
+
+CREATE TRIGGER expire_complited_tasks
+AFTER INSERT OR UPDATE ON {SCHEMA}.tasks
+    FOR EACH ROW EXECUTE PROCEDURE {SCHEMA}.process_expire_complited_tasks();
+"""
+
+CREATE_INDEX = f"""
+CREATE INDEX ix_tasks_close_date ON {SCHEMA}.tasks (close_date)
+    WHERE close_date IS NOT NULL;
+"""
+
+FILL = f"""
+INSERT INTO {SCHEMA}.tasks (title, open_date, close_date)
+SELECT 'existing', current_date - 400, CASE
+    WHEN i % 10 = 0 THEN current_date - 390
+    WHEN i % 2 = 0 THEN current_date - 10
+END
+FROM generate_series(1, $1) AS i;
+"""
+
+INSERT = f"INSERT INTO {SCHEMA}.tasks (title, close_date) VALUES ($1, $2)"
+
+EXPIRE_BATCH = f"""
+DELETE FROM {SCHEMA}.tasks WHERE id IN (
+    SELECT id FROM {SCHEMA}.tasks
+    WHERE close_date < current_date - INTERVAL '12 month'
+    LIMIT $1
+)
+"""
+
+
+async def _prepare(conn: asyncpg.Connection, existing: int, trigger: bool) -> None:
+    await conn.execute(CREATE_TABLE)
+    await conn.execute(FILL, existing)
+
+    if trigger:
+        await conn.execute(CREATE_TRIGGER)
+    else:
+        await conn.execute(CREATE_INDEX)
+
+    await conn.execute(f"ANALYZE {SCHEMA}.tasks")
+
+
+async def _insert(conn: asyncpg.Connection, rows: int) -> float:
+    data = [(f"task {i}", None) for i in range(rows)]
+
+    start = time.perf_counter()
+    async with conn.transaction():
+        await conn.executemany(INSERT, data)
+
+    return time.perf_counter() - start
+
+
+async def _expire(conn: asyncpg.Connection, batch_size: int) -> float:
+    start = time.perf_counter()
+    while True:
+        status = await conn.execute(EXPIRE_BATCH, batch_size)
+        if int(status.split()[-1]) < batch_size:
+            break
+
+    return time.perf_counter() - start
+
+
+async def main(rows: int, existing: int, batch_size: int) -> None:
+    conn = await asyncpg.connect(settings.POSTGRES_DSN.replace("+asyncpg", ""))
+
+    try:
+        await _prepare(conn, existing, trigger=True)
+        before = await _insert(conn, rows)
+
+        await _prepare(conn, existing, trigger=False)
+        after = await _insert(conn, rows)
+        expire = await _expire(conn, batch_size)
+
+        print(f"existing rows: {existing}, inserted rows: {rows}")
+        print(f"per-row trigger: {before:.3f}s, {rows / before:.0f} rows/s")
+        print(f"batched job:     {after:.3f}s, {rows / after:.0f} rows/s")
+        print(f"retention run:   {expire:.3f}s")
+
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--existing", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.existing, args.batch_size))
@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -31,6 +32,13 @@ target_metadata = metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# partitions of shop.task are managed by shop.create_task_partitions
+TASK_PARTITION = re.compile(r"^task_(\d{4}_\d{2}|default)$")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    return not (type_ == "table" and TASK_PARTITION.match(name))
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -60,6 +68,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         include_schemas=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
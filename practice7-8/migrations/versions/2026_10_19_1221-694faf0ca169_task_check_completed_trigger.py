@@ -0,0 +1,56 @@
+"""task check_completed trigger
+
+Revision ID: 694faf0ca169
+Revises: a4d5401f350c
+Create Date: 2026-10-19 12:21:47.105328
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "694faf0ca169"
+down_revision = "a4d5401f350c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION "shop"."process_check_completed"()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        AS $$
+            BEGIN
+                IF (
+                    OLD.completed
+                    AND current_setting('shop.is_admin', true)
+                        IS DISTINCT FROM 'on'
+                ) THEN
+                    RAISE EXCEPTION 'Can not change completed task'
+                        USING ERRCODE = 'insufficient_privilege';
+                END IF;
+                IF (NEW.completed AND NOT OLD.completed) THEN
+                    NEW.close_date = current_date;
+                END IF;
+                RETURN NEW;
+            END;
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER "check_completed"
+        BEFORE UPDATE ON "shop"."task"
+            FOR EACH ROW
+            WHEN (OLD.completed OR NEW.completed)
+            EXECUTE PROCEDURE "shop"."process_check_completed"();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER "check_completed" ON "shop"."task"')
+    op.execute('DROP FUNCTION "shop"."process_check_completed"()')
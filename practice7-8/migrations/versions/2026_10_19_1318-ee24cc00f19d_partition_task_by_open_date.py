@@ -0,0 +1,239 @@
+"""partition task by open_date
+
+Revision ID: ee24cc00f19d
+Revises: 694faf0ca169
+Create Date: 2026-10-19 13:18:26.440152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "ee24cc00f19d"
+down_revision = "694faf0ca169"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, title, description, priority_id, type_id, open_date, close_date, "
+    "due_date, completed, author_id, executor_id, contract_id, "
+    "contact_person_id"
+)
+
+CHECK_COMPLETED_TRIGGER = """
+CREATE TRIGGER "check_completed"
+BEFORE UPDATE ON "shop"."task"
+    FOR EACH ROW
+    WHEN (OLD.completed OR NEW.completed)
+    EXECUTE PROCEDURE "shop"."process_check_completed"();
+"""
+
+
+def task_columns():
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.TEXT(), nullable=True),
+        sa.Column("priority_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("type_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("open_date", sa.Date(), nullable=False),
+        sa.Column("close_date", sa.Date(), nullable=True),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("completed", sa.Boolean(), nullable=False),
+        sa.Column("author_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("executor_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("contract_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("contact_person_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["author_id"],
+            ["shop.user.id"],
+            name=op.f("fk__task__user__author_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["contact_person_id"],
+            ["shop.contact_person.id"],
+            name=op.f("fk__task__contact_person__contact_person_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["contract_id"],
+            ["shop.contract.id"],
+            name=op.f("fk__task__contract__contract_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["executor_id"],
+            ["shop.user.id"],
+            name=op.f("fk__task__user__executor_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["priority_id"],
+            ["shop.task_priority.id"],
+            name=op.f("fk__task__task_priority__priority_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["type_id"],
+            ["shop.task_type.id"],
+            name=op.f("fk__task__task_type__type_id"),
+            initially="DEFERRED",
+            deferrable=True,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE "shop"."task" RENAME TO "task_unpartitioned"')
+    op.execute('DROP TRIGGER "check_completed" ON "shop"."task_unpartitioned"')
+    op.drop_index("ix__close_date", table_name="task_unpartitioned", schema="shop")
+
+    op.create_table(
+        "task",
+        *task_columns(),
+        sa.PrimaryKeyConstraint("id", "open_date", name=op.f("pk__task__id_open_date")),
+        schema="shop",
+        postgresql_partition_by="RANGE (open_date)",
+    )
+    op.create_index(
+        op.f("ix__close_date"),
+        "task",
+        ["close_date"],
+        unique=False,
+        schema="shop",
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION "shop"."create_task_partitions"(
+            start_date DATE, months_ahead INT
+        )
+        RETURNS VOID
+        LANGUAGE plpgsql
+        AS $$
+            DECLARE
+                month DATE := date_trunc('month', start_date);
+                last_month DATE := date_trunc('month', current_date)
+                    + make_interval(months => months_ahead);
+                partition TEXT;
+            BEGIN
+                WHILE month <= last_month LOOP
+                    partition := 'task_' || to_char(month, 'YYYY_MM');
+
+                    IF to_regclass(format('"shop".%I', partition)) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE "shop".%I PARTITION OF "shop"."task" '
+                            'FOR VALUES FROM (%L) TO (%L)',
+                            partition,
+                            month,
+                            month + INTERVAL '1 month'
+                        );
+                    END IF;
+
+                    month := month + INTERVAL '1 month';
+                END LOOP;
+            END;
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION "shop"."drop_expired_task_partitions"(
+            months INT
+        )
+        RETURNS INT
+        LANGUAGE plpgsql
+        AS $$
+            DECLARE
+                cutoff DATE := current_date - make_interval(months => months);
+                part RECORD;
+                expired BOOLEAN;
+                dropped INT := 0;
+            BEGIN
+                FOR part IN
+                    SELECT
+                        c.relname,
+                        to_date(substring(c.relname FROM 6), 'YYYY_MM') AS month
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = '"shop"."task"'::regclass
+                        AND c.relname ~ '^task_\\d{4}_\\d{2}$'
+                    ORDER BY 2
+                LOOP
+                    EXIT WHEN part.month + INTERVAL '1 month' > cutoff;
+
+                    EXECUTE format(
+                        'SELECT NOT EXISTS (SELECT 1 FROM "shop".%I '
+                        'WHERE close_date IS NULL OR close_date >= %L)',
+                        part.relname,
+                        cutoff
+                    ) INTO expired;
+
+                    IF expired THEN
+                        EXECUTE format('DROP TABLE "shop".%I', part.relname);
+                        dropped := dropped + 1;
+                    END IF;
+                END LOOP;
+
+                RETURN dropped;
+            END;
+        $$;
+        """
+    )
+
+    op.execute('CREATE TABLE "shop"."task_default" PARTITION OF "shop"."task" DEFAULT')
+    op.execute(
+        """
+        SELECT "shop"."create_task_partitions"(
+            coalesce(
+                (SELECT min(open_date) FROM "shop"."task_unpartitioned"),
+                current_date
+            ),
+            3
+        )
+        """
+    )
+    op.execute(
+        f'INSERT INTO "shop"."task" ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM "shop"."task_unpartitioned"'
+    )
+    op.drop_table("task_unpartitioned", schema="shop")
+
+    op.execute(CHECK_COMPLETED_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE "shop"."task" RENAME TO "task_partitioned"')
+    op.drop_index("ix__close_date", table_name="task_partitioned", schema="shop")
+
+    op.create_table(
+        "task",
+        *task_columns(),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__task__id")),
+        schema="shop",
+    )
+    op.create_index(
+        op.f("ix__close_date"),
+        "task",
+        ["close_date"],
+        unique=False,
+        schema="shop",
+    )
+
+    op.execute(
+        f'INSERT INTO "shop"."task" ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM "shop"."task_partitioned"'
+    )
+    op.drop_table("task_partitioned", schema="shop")
+
+    op.execute('DROP FUNCTION "shop"."drop_expired_task_partitions"(INT)')
+    op.execute('DROP FUNCTION "shop"."create_task_partitions"(DATE, INT)')
+
+    op.execute(CHECK_COMPLETED_TRIGGER)
@@ -0,0 +1,66 @@
+"""task notify change trigger
+
+Revision ID: 32e4cd466608
+Revises: f317166821bf
+Create Date: 2026-10-19 16:03:32.754748
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "32e4cd466608"
+down_revision = "f317166821bf"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION "shop"."process_notify_change"()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        AS $$
+            DECLARE
+                task RECORD;
+            BEGIN
+                IF (TG_OP = 'DELETE') THEN
+                    task = OLD;
+                ELSE
+                    task = NEW;
+                END IF;
+                PERFORM pg_notify(
+                    'task_changes',
+                    json_build_object(
+                        'op', lower(TG_OP),
+                        'id', task.id,
+                        'version', task.version,
+                        'executor_id', task.executor_id,
+                        'author_id', task.author_id,
+                        'old_executor_id', CASE
+                            WHEN TG_OP = 'UPDATE'
+                                AND OLD.executor_id <> NEW.executor_id
+                            THEN OLD.executor_id
+                        END
+                    )::text
+                );
+                RETURN NULL;
+            END;
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER "notify_change"
+        AFTER INSERT OR UPDATE OR DELETE ON "shop"."task"
+            FOR EACH ROW
+            EXECUTE PROCEDURE "shop"."process_notify_change"();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER "notify_change" ON "shop"."task"')
+    op.execute('DROP FUNCTION "shop"."process_notify_change"()')
@@ -0,0 +1,59 @@
+"""tombstones for dropped task partitions
+
+Revision ID: d2a6f83e57c1
+Revises: 5b7e0d9c41a3
+Create Date: 2026-10-19 17:10:12.503927
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2a6f83e57c1"
+down_revision = "5b7e0d9c41a3"
+branch_labels = None
+depends_on = None
+
+DROP_TASK_PARTITION = """
+CREATE OR REPLACE FUNCTION "shop"."drop_task_partition"(
+    partition TEXT
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+    DECLARE
+        month DATE := to_date(substring(partition FROM 6), 'YYYY_MM');
+    BEGIN
+        {tombstones}
+        DELETE FROM "shop"."task_key"
+        WHERE open_date >= month
+            AND open_date < month + INTERVAL '1 month';
+
+        EXECUTE format(
+            'ALTER TABLE "shop"."task" DETACH PARTITION "shop".%I',
+            partition
+        );
+        EXECUTE format('DROP TABLE "shop".%I', partition);
+    END;
+$$;
+"""
+
+# dropping a table fires no row triggers, the tombstones record_tombstone
+# writes for deleted tasks are written here
+TOMBSTONES = """
+        EXECUTE format(
+            'INSERT INTO "shop"."tombstone" '
+            '(id, entity, entity_id, visible_to, deleted_at) '
+            'SELECT gen_random_uuid(), ''task'', id, '
+            'ARRAY[executor_id, author_id], now() '
+            'FROM "shop".%I',
+            partition
+        );
+"""
+
+
+def upgrade() -> None:
+    op.execute(DROP_TASK_PARTITION.format(tombstones=TOMBSTONES))
+
+
+def downgrade() -> None:
+    op.execute(DROP_TASK_PARTITION.format(tombstones=""))